@@ -2,52 +2,214 @@
 Gemini AI Client
 Conversation generation and niche detection
 """
+import logging
+import asyncio
+import json
+import re
+import threading
 import google.generativeai as genai
 from typing import Optional, List
 
-from config import GEMINI_API_KEY, get_time_of_day
+try:
+    import ahocorasick  # Optional: pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+from config import GEMINI_API_KEY, BATCH_NICHE_SIZE, get_time_of_day
+from ai import niche_cache
 from ai.prompts import (
     SYSTEM_PROMPT,
     NICHE_DETECTION_PROMPT,
+    NICHE_BATCH_PROMPT,
+    SUMMARY_PROMPT,
     get_first_message_prompt,
     get_reply_prompt
 )
 
+log = logging.getLogger("instabot")
+
 
 # Configure Gemini
 genai.configure(api_key=GEMINI_API_KEY)
 
+# Models are built once and shared; every call reuses the same client/channel
+_DEFAULT_MODEL = genai.GenerativeModel(
+    model_name="models/gemini-2.5-flash",
+    system_instruction=SYSTEM_PROMPT
+)
+_NICHE_MODEL = genai.GenerativeModel("models/gemini-2.5-flash")  # No sales persona
+
+# The shared async gRPC channel is bound to the event loop it was first used on,
+# so every Gemini request runs on one long-lived background loop. Callers can be
+# on any loop (scheduler, worker threads) or block on it via the *_sync wrappers.
+_gemini_loop: Optional[asyncio.AbstractEventLoop] = None
+_gemini_loop_lock = threading.Lock()
+
+
+def _get_gemini_loop() -> asyncio.AbstractEventLoop:
+    """Start the background Gemini event loop on first use"""
+    global _gemini_loop
+    with _gemini_loop_lock:
+        if _gemini_loop is None:
+            _gemini_loop = asyncio.new_event_loop()
+            threading.Thread(target=_gemini_loop.run_forever, name="gemini-loop", daemon=True).start()
+    return _gemini_loop
+
+
+async def _generate(model, prompt: str, **kwargs):
+    """Await model.generate_content_async on the shared Gemini loop"""
+    future = asyncio.run_coroutine_threadsafe(
+        model.generate_content_async(prompt, **kwargs),
+        _get_gemini_loop()
+    )
+    return await asyncio.wrap_future(future)
+
+
+def _run_sync(coro):
+    """Run a Gemini coroutine on the shared loop and block until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_gemini_loop()).result()
+
+VALID_NICHES = ('business', 'ecommerce', 'services', 'personal_brand')
+
+# Rejection indicators
+REJECTION_PHRASES = frozenset({
+    'kerak emas', 'qiziq emas', "yo'q", 'rahmat lekin',
+    'hozir emas', 'vaqtim yo\'q', 'boshqa safar', 'spam'
+})
+
+# Problem mention indicators
+PROBLEM_PHRASES = frozenset({
+    'muammo', 'qiyin', 'vaqt', 'ketadi', 'umuman',
+    'yordam', 'kerak', 'qanday', 'nima qilsam'
+})
+
+# Engagement indicators (whole-message match, O(1) set lookup)
+NEUTRAL_ENGAGEMENT = frozenset({'ok', 'ha', 'yoq', 'hmm', 'xop', 'bilmadim', 'ko\'ramiz'})
+
+
+def _build_phrase_automaton():
+    """Build one Aho-Corasick automaton over rejection + problem phrases"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kind, phrases in (('rejection', REJECTION_PHRASES), ('problem', PROBLEM_PHRASES)):
+        for phrase in phrases:
+            # A phrase may belong to several groups, keep all of them
+            _, kinds = automaton.get(phrase, (phrase, ()))
+            automaton.add_word(phrase, (phrase, kinds + (kind,)))
+    automaton.make_automaton()
+    return automaton
+
+
+PHRASE_AUTOMATON = _build_phrase_automaton()
+
+# Fallback without pyahocorasick: one compiled alternation per group (single regex scan)
+_REJECTION_RE = re.compile("|".join(map(re.escape, REJECTION_PHRASES)))
+_PROBLEM_RE = re.compile("|".join(map(re.escape, PROBLEM_PHRASES)))
+
 
 def get_model():
     """Get Gemini Flash model (fast and efficient)"""
-    return genai.GenerativeModel(
-        model_name="models/gemini-2.5-flash",
-        system_instruction=SYSTEM_PROMPT
-    )
+    return _DEFAULT_MODEL
 
 
-def detect_niche(bio: str, last_post: str) -> str:
+async def detect_niche(bio: str, last_post: str) -> str:
     """
     Detect lead's niche using AI.
     Returns: business, ecommerce, services, or personal_brand
     """
+    key = niche_cache.niche_key(bio, last_post)
+    cached = niche_cache.lookup(key)
+    if cached:
+        return cached
+    
     try:
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
+        model = _NICHE_MODEL
         prompt = NICHE_DETECTION_PROMPT.format(bio=bio, last_post=last_post)
-        response = model.generate_content(prompt)
+        response = await _generate(model, prompt)
         
         niche = response.text.strip().lower()
-        valid_niches = ['business', 'ecommerce', 'services', 'personal_brand']
         
-        if niche in valid_niches:
+        if niche in VALID_NICHES:
+            niche_cache.store(key, niche)
             return niche
         return 'business'  # Default fallback
     except Exception as e:
-        print(f"⚠️ Niche detection failed: {e}")
+        log.warning(f"⚠️ Niche detection failed: {e}")
         return 'business'
 
 
-def generate_first_message(bio: str, last_post_topic: str, niche: str) -> str:
+async def detect_niches_batch(leads: list) -> List[str]:
+    """
+    Detect niches for many leads with as few Gemini requests as possible.
+    Each lead (scraper Lead) needs .bio and .last_post_topic; niches are returned in the same order.
+    """
+    niches = [None] * len(leads)
+    keys = [niche_cache.niche_key(lead.bio, lead.last_post_topic) for lead in leads]
+    
+    misses = []
+    for i, key in enumerate(keys):
+        cached = niche_cache.lookup(key)
+        if cached:
+            niches[i] = cached
+        else:
+            misses.append(i)
+    
+    for start in range(0, len(misses), BATCH_NICHE_SIZE):
+        chunk = misses[start:start + BATCH_NICHE_SIZE]
+        detected = await _detect_niche_chunk([leads[i] for i in chunk])
+        
+        if detected is None:
+            # Batch failed or came back misaligned, classify one by one
+            detected = await asyncio.gather(*(
+                detect_niche(leads[i].bio, leads[i].last_post_topic)
+                for i in chunk
+            ))
+            for i, niche in zip(chunk, detected):
+                niches[i] = niche
+            continue
+        
+        for i, niche in zip(chunk, detected):
+            if niche in VALID_NICHES:
+                niche_cache.store(keys[i], niche)
+                niches[i] = niche
+            else:
+                niches[i] = 'business'  # Default fallback
+    
+    return niches
+
+
+async def _detect_niche_chunk(leads: list) -> Optional[List[str]]:
+    """Single Gemini request for up to BATCH_NICHE_SIZE leads, None on failure"""
+    items = "\n".join(
+        f"[{n}] bio={lead.bio!r}, post={lead.last_post_topic!r}"
+        for n, lead in enumerate(leads, start=1)
+    )
+    prompt = NICHE_BATCH_PROMPT.format(items=items, count=len(leads))
+    
+    try:
+        model = _NICHE_MODEL
+        response = await _generate(
+            model,
+            prompt,
+            generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": list[str]
+            }
+        )
+        detected = json.loads(response.text)
+    except Exception as e:
+        log.warning(f"⚠️ Batch niche detection failed: {e}")
+        return None
+    
+    if not isinstance(detected, list) or len(detected) != len(leads):
+        log.warning(f"⚠️ Batch niche detection returned {len(detected) if isinstance(detected, list) else 'invalid'} results for {len(leads)} items")
+        return None
+    
+    return [str(niche).strip().lower() for niche in detected]
+
+
+async def generate_first_message(bio: str, last_post_topic: str, niche: str) -> str:
     """
     Generate first DM message for a lead.
     Uses profile info to create personalized opener.
@@ -57,7 +219,7 @@ def generate_first_message(bio: str, last_post_topic: str, niche: str) -> str:
         time_of_day = get_time_of_day()
         
         prompt = get_first_message_prompt(bio, last_post_topic, niche, time_of_day)
-        response = model.generate_content(prompt)
+        response = await _generate(model, prompt)
         
         message = response.text.strip()
         # Remove any quotes if present
@@ -65,7 +227,7 @@ def generate_first_message(bio: str, last_post_topic: str, niche: str) -> str:
         
         return message
     except Exception as e:
-        print(f"❌ Message generation failed: {e}. Using fallback.")
+        log.error(f"❌ Message generation failed: {e}. Using fallback.")
         templates = {
             "morning": "Assalomu alaykum! Ishlaringiz va biznesingiz yaxshimi? Akkauntingizni kuzatib qiziq mavzularni ko'rdim.",
             "afternoon": "Assalomu alaykum! Biznesingiz rivoji qanday ketyapti? Profilingizdagi kontentlar juda qiziqarli ekan.",
@@ -75,7 +237,8 @@ def generate_first_message(bio: str, last_post_topic: str, niche: str) -> str:
         return templates.get(time_of_day, "Assalomu alaykum! Ishlaringiz yaxshimi? Profilingizni kuzatib juda qiziqib qoldim.")
 
 
-def generate_reply(conversation_history: List[dict], lead_info: dict) -> str:
+async def generate_reply(conversation_history: List[dict], lead_info: dict,
+                         summary: Optional[str] = None) -> str:
     """
     Generate reply based on conversation history.
     Handles qualification, rejection detection, and soft transition.
@@ -84,18 +247,55 @@ def generate_reply(conversation_history: List[dict], lead_info: dict) -> str:
         model = get_model()
         time_of_day = get_time_of_day()
         
-        prompt = get_reply_prompt(conversation_history, lead_info, time_of_day)
-        response = model.generate_content(prompt)
+        prompt = get_reply_prompt(conversation_history, lead_info, time_of_day, summary)
+        response = await _generate(model, prompt)
         
         message = response.text.strip()
         message = message.strip('"\'')
         
         return message
     except Exception as e:
-        print(f"❌ Reply generation failed: {e}")
+        log.error(f"❌ Reply generation failed: {e}")
+        return ""
+
+
+async def summarize_conversation(conversation_history: List[dict], previous_summary: str = "") -> str:
+    """
+    Condense a conversation into one sentence for long-running threads.
+    Returns empty string on failure (caller keeps the old summary).
+    """
+    try:
+        model = _NICHE_MODEL
+        history_text = "\n".join(
+            f"{'Bot' if msg['role'] == 'assistant' else 'User'}: {msg['content']}"
+            for msg in conversation_history
+        )
+        prompt = SUMMARY_PROMPT.format(previous_summary=previous_summary or "-", history=history_text)
+        response = await _generate(model, prompt)
+        return response.text.strip()
+    except Exception as e:
+        log.warning(f"⚠️ Conversation summary failed: {e}")
         return ""
 
 
+# Blocking wrappers for plain-thread callers (scraper, scripts) without an event loop
+
+def detect_niche_sync(bio: str, last_post: str) -> str:
+    """Blocking detect_niche"""
+    return _run_sync(detect_niche(bio, last_post))
+
+
+def generate_first_message_sync(bio: str, last_post_topic: str, niche: str) -> str:
+    """Blocking generate_first_message"""
+    return _run_sync(generate_first_message(bio, last_post_topic, niche))
+
+
+def generate_reply_sync(conversation_history: List[dict], lead_info: dict,
+                        summary: Optional[str] = None) -> str:
+    """Blocking generate_reply"""
+    return _run_sync(generate_reply(conversation_history, lead_info, summary))
+
+
 def analyze_user_response(message: str) -> dict:
     """
     Analyze user's response to determine intent and scoring.
@@ -103,26 +303,24 @@ def analyze_user_response(message: str) -> dict:
     """
     message_lower = message.lower().strip()
     
-    # Rejection indicators
-    rejection_phrases = [
-        'kerak emas', 'qiziq emas', "yo'q", 'rahmat lekin',
-        'hozir emas', 'vaqtim yo\'q', 'boshqa safar', 'spam'
-    ]
-    is_rejection = any(phrase in message_lower for phrase in rejection_phrases)
+    if PHRASE_AUTOMATON is not None:
+        # Single C-level pass over the message for all phrase groups
+        is_rejection = mentions_problem = False
+        for _, (_, kinds) in PHRASE_AUTOMATON.iter(message_lower):
+            if 'rejection' in kinds:
+                is_rejection = True
+            if 'problem' in kinds:
+                mentions_problem = True
+            if is_rejection and mentions_problem:
+                break
+    else:
+        is_rejection = bool(_REJECTION_RE.search(message_lower))
+        mentions_problem = bool(_PROBLEM_RE.search(message_lower))
     
     # Question indicators (they're engaged)
     is_question = '?' in message
     
-    # Problem mention indicators
-    problem_phrases = [
-        'muammo', 'qiyin', 'vaqt', 'ketadi', 'umuman',
-        'yordam', 'kerak', 'qanday', 'nima qilsam'
-    ]
-    mentions_problem = any(phrase in message_lower for phrase in problem_phrases)
-    
-    # Engagement indicators
-    neutral_engagement = ['ok', 'ha', 'yoq', 'hmm', 'xop', 'bilmadim', 'ko\'ramiz']
-    is_neutral = message_lower in neutral_engagement or len(message) < 10
+    is_neutral = message_lower in NEUTRAL_ENGAGEMENT or len(message) < 10
     
     return {
         'is_rejection': is_rejection,
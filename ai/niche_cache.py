@@ -0,0 +1,77 @@
+"""
+Niche Cache
+Two-layer cache (in-process LRU + database) for detect_niche results
+"""
+import logging
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from config import NICHE_CACHE_TTL_DAYS
+from database.models import get_cached_niche, save_cached_niche, clear_niche_cache
+
+log = logging.getLogger("instabot")
+
+MEMORY_MAXSIZE = 4096
+TTL_SECONDS = NICHE_CACHE_TTL_DAYS * 24 * 60 * 60
+
+# hash -> (niche, ts), most recently used last
+_memory: "OrderedDict[str, tuple]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def niche_key(bio: str, last_post: str) -> str:
+    """Content hash for a (bio, last_post) pair"""
+    return hashlib.sha256(f"{bio}\x1f{last_post}".encode()).hexdigest()[:16]
+
+
+def lookup(key: str) -> Optional[str]:
+    """Probe memory, then database. Returns None on miss or expired entry."""
+    now = int(time.time())
+    
+    with _lock:
+        entry = _memory.get(key)
+        if entry:
+            niche, ts = entry
+            if now - ts < TTL_SECONDS:
+                _memory.move_to_end(key)
+                return niche
+            del _memory[key]
+    
+    try:
+        niche = get_cached_niche(key, now - TTL_SECONDS)
+    except Exception as e:
+        log.warning(f"⚠️ Niche cache lookup failed: {e}")
+        return None
+    
+    if niche:
+        _remember(key, niche, now)
+    return niche
+
+
+def store(key: str, niche: str):
+    """Write a detected niche to both cache layers"""
+    now = int(time.time())
+    _remember(key, niche, now)
+    try:
+        save_cached_niche(key, niche, now)
+    except Exception as e:
+        log.warning(f"⚠️ Niche cache write failed: {e}")
+
+
+def clear() -> int:
+    """Drop both cache layers, returns number of database rows removed"""
+    with _lock:
+        _memory.clear()
+    return clear_niche_cache()
+
+
+def _remember(key: str, niche: str, ts: int):
+    """Insert into the in-process LRU, evicting the oldest entry if full"""
+    with _lock:
+        _memory[key] = (niche, ts)
+        _memory.move_to_end(key)
+        if len(_memory) > MEMORY_MAXSIZE:
+            _memory.popitem(last=False)
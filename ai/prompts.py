@@ -2,6 +2,10 @@
 System Prompts for Instagram DM Bot
 Uzbek language, conversation-based lead qualification
 """
+from typing import Optional, Sequence
+from itertools import islice
+
+from config import REPLY_HISTORY_TURNS
 
 # Main conversation system prompt
 SYSTEM_PROMPT = """You are an Instagram DM Sales Agent for an AI Automation Agency.
@@ -54,10 +58,36 @@ Based on the content, classify into ONE of these categories:
 
 Respond with ONLY the category name, nothing else."""
 
+# Batched niche detection prompt (one request for many profiles)
+NICHE_BATCH_PROMPT = """Analyze each Instagram profile below and determine its niche.
 
-def get_first_message_prompt(bio: str, last_post_topic: str, niche: str, time_of_day: str) -> str:
-    """Generate prompt for first message generation"""
-    return f"""Generate a first DM message for this Instagram user.
+Classify every item into ONE of these categories:
+- business (company, B2B, consulting, agency)
+- ecommerce (online shop, products, dropshipping)
+- services (freelancer, trainer, specialist)
+- personal_brand (influencer, blogger, content creator)
+
+Items:
+{items}
+
+Respond with a JSON array containing exactly {count} category names, one per item, in the same order."""
+
+
+# Rolling conversation summary prompt (keeps reply prompts short)
+SUMMARY_PROMPT = """Summarize this Instagram DM conversation between our sales agent (Bot) and a lead (User).
+
+PREVIOUS SUMMARY:
+{previous_summary}
+
+CONVERSATION:
+{history}
+
+Write ONE short sentence in English covering the lead's interest level, needs and objections.
+Respond with ONLY the summary sentence."""
+
+
+# First message template (static text built once, fields filled per call)
+FIRST_MESSAGE_TEMPLATE = """Generate a first DM message for this Instagram user.
 
 PROFILE INFO:
 - Bio: {bio}
@@ -76,15 +106,8 @@ RULES:
 
 Generate the message:"""
 
-
-def get_reply_prompt(conversation_history: list, lead_info: dict, time_of_day: str) -> str:
-    """Generate prompt for reply generation"""
-    history_text = "\n".join([
-        f"{'Bot' if msg['role'] == 'assistant' else 'User'}: {msg['content']}"
-        for msg in conversation_history
-    ])
-    
-    return f"""Continue this Instagram DM conversation about AI Project services.
+# Reply template
+REPLY_TEMPLATE = """Continue this Instagram DM conversation about AI Project services.
 
 CONVERSATION HISTORY:
 {history_text}
@@ -101,3 +124,27 @@ RULES:
 - Uzbek language (latin)
 
 Generate your reply:"""
+
+
+def get_first_message_prompt(bio: str, last_post_topic: str, niche: str, time_of_day: str) -> str:
+    """Generate prompt for first message generation"""
+    return FIRST_MESSAGE_TEMPLATE.format_map({
+        'bio': bio,
+        'last_post_topic': last_post_topic,
+        'niche': niche,
+        'time_of_day': time_of_day
+    })
+
+
+def get_reply_prompt(conversation_history: Sequence[dict], lead_info: dict, time_of_day: str,
+                     summary: Optional[str] = None) -> str:
+    """Generate prompt for reply generation (last turns + rolling summary)"""
+    history_text = "\n".join(
+        f"{'Bot' if msg['role'] == 'assistant' else 'User'}: {msg['content']}"
+        for msg in islice(conversation_history, max(0, len(conversation_history) - REPLY_HISTORY_TURNS), None)
+    )
+    
+    if summary and len(conversation_history) > REPLY_HISTORY_TURNS:
+        history_text = f"SUMMARY: {summary}\n\nRECENT:\n{history_text}"
+    
+    return REPLY_TEMPLATE.format_map({'history_text': history_text})
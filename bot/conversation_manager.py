@@ -2,34 +2,43 @@
 Conversation Manager
 Handles multi-turn conversations, state tracking, and scoring
 """
+import logging
 from typing import Optional
 from datetime import datetime
+from functools import cached_property
+from collections import deque
 
 from database.models import (
     get_lead_by_username,
+    get_lead_state,
     get_conversation,
     get_conversation_history,
     add_message,
     update_conversation_state,
+    update_conversation_summary,
     update_lead_status,
-    update_lead_score,
     increment_message_count,
     increment_rejections,
-    reset_rejections,
+    apply_reply_transaction,
     pause_bot
 )
 from ai.gemini_client import (
     generate_first_message,
     generate_reply,
+    summarize_conversation,
     analyze_user_response,
     calculate_score_delta
 )
 from config import (
     SCORE_THRESHOLD,
+    REPLY_HISTORY_TURNS,
+    SUMMARY_EVERY_TURNS,
     CONSECUTIVE_REJECTIONS_LIMIT,
     KILL_SWITCH_DURATION
 )
 
+log = logging.getLogger("instabot")
+
 
 class ConversationManager:
     """Manages conversation flow, state, and scoring"""
@@ -43,16 +52,38 @@ class ConversationManager:
     STATE_CONVERTED = 'converted'
     STATE_EXITED = 'exited'
     
+    # Messages kept in memory (and passed to Gemini) per conversation
+    MAX_HISTORY = 20
+    
+    # Polite exit sent when the user rejects
+    EXIT_MESSAGE = "Tushundim, vaqt ajratganingiz uchun rahmat."
+    
     def __init__(self, username: str):
         self.username = username
-        self.lead = get_lead_by_username(username)
-        self.conversation = None
-        self.history = []
-        
-        if self.lead:
-            self.conversation = get_conversation(self.lead['id'])
-            if self.conversation:
-                self.history = get_conversation_history(self.conversation['id'])
+        # Writes for the reply generated by process_user_reply, applied by commit_reply
+        self._pending_reply: Optional[dict] = None
+    
+    @cached_property
+    def lead(self) -> Optional[dict]:
+        """Lead row, loaded on first use (should_respond gets by without it)"""
+        return get_lead_by_username(self.username)
+    
+    @cached_property
+    def conversation(self) -> Optional[dict]:
+        """Conversation row, loaded on first use"""
+        if not self.lead:
+            return None
+        return get_conversation(self.lead['id'])
+    
+    @cached_property
+    def history(self) -> deque:
+        """Last MAX_HISTORY messages (older ones drop off), loaded on first use"""
+        if not self.conversation:
+            return deque(maxlen=self.MAX_HISTORY)
+        return deque(
+            get_conversation_history(self.conversation['id'], last=self.MAX_HISTORY),
+            maxlen=self.MAX_HISTORY
+        )
     
     def get_state(self) -> str:
         """Get current conversation state"""
@@ -68,90 +99,143 @@ class ConversationManager:
     
     def should_respond(self) -> bool:
         """Check if bot should respond to this user"""
-        state = self.get_state()
+        # State + score only; conversation and history stay unloaded if we skip
+        lead_state = get_lead_state(self.username)
+        state, score = lead_state if lead_state else (None, 0)
+        state = state or self.STATE_NEW
         
         # Don't respond to rejected/exited conversations
         if state in [self.STATE_REJECTED, self.STATE_EXITED]:
             return False
         
         # Check confidence score
-        if self.lead and self.lead.get('confidence_score', 0) < SCORE_THRESHOLD:
-            print(f"⚠️ Score too low for {self.username}, exiting")
+        # lead_state is only set when the lead row exists
+        if lead_state and (score or 0) < SCORE_THRESHOLD:
+            log.warning(f"⚠️ Score too low for {self.username}, exiting")
             self._exit_politely()
             return False
         
         return True
     
-    def generate_first_message(self) -> Optional[str]:
+    async def generate_first_message(self) -> Optional[str]:
         """Generate and track first message"""
+        message = await self.draft_first_message()
+        if message:
+            self.record_first_message(message)
+        return message
+    
+    async def draft_first_message(self) -> Optional[str]:
+        """Generate first message text without saving anything"""
         if not self.lead:
             return None
         
-        message = generate_first_message(
+        return await generate_first_message(
             bio=self.lead.get('bio', ''),
             last_post_topic=self.lead.get('last_post_topic', ''),
             niche=self.lead.get('niche', 'business')
         )
-        
-        if message:
-            # Save to history
-            add_message(self.conversation['id'], 'assistant', message)
-            increment_message_count(self.lead['id'])
-            update_conversation_state(self.lead['id'], self.STATE_FIRST_SENT)
-            update_lead_status(self.username, 'contacted')
-            
-        return message
     
-    def process_user_reply(self, user_message: str) -> Optional[str]:
+    def record_first_message(self, message: str):
+        """Save first message to history and mark the lead as contacted"""
+        add_message(self.conversation['id'], 'assistant', message)
+        # An unloaded history would read the new row from the database anyway
+        if 'history' in self.__dict__:
+            self.history.append({'role': 'assistant', 'content': message})
+        increment_message_count(self.lead['id'])
+        update_conversation_state(self.lead['id'], self.STATE_FIRST_SENT)
+        update_lead_status(self.username, 'contacted')
+    
+    async def process_user_reply(self, user_message: str) -> Optional[str]:
         """
         Process user's reply and generate response.
-        Handles scoring, rejection detection, and state transitions.
+        Scores the message and picks the next state, but saves nothing:
+        call commit_reply() once the response has actually been sent.
         """
         if not self.lead or not self.conversation:
             return None
         
-        # Save user message to history
-        add_message(self.conversation['id'], 'user', user_message)
-        
         # Analyze response
         analysis = analyze_user_response(user_message)
         score_delta = calculate_score_delta(analysis)
-        
-        # Update score
-        update_lead_score(self.username, score_delta)
-        print(f"📊 Score delta: {score_delta:+d} for {self.username}")
+        log.info(f"📊 Score delta: {score_delta:+d} for {self.username}")
         
         # Handle rejection
         if analysis['is_rejection']:
-            return self._handle_rejection()
-        
-        # Reset rejection counter on normal response
-        reset_rejections(self.username)
+            self._pending_reply = {
+                'user_message': user_message,
+                'score_delta': score_delta,
+                'rejection': True,
+            }
+            return self.EXIT_MESSAGE
         
         # Update state based on message count
         msg_count = self.get_message_count()
         if msg_count >= 3:
-            update_conversation_state(self.lead['id'], self.STATE_SOFT_TRANSITION)
+            new_state = self.STATE_SOFT_TRANSITION
         else:
-            update_conversation_state(self.lead['id'], self.STATE_QUALIFYING)
+            new_state = self.STATE_QUALIFYING
         
-        # Refresh history
-        self.history = get_conversation_history(self.conversation['id'])
+        # Keep history in memory instead of re-reading it from the database
+        self.history.append({'role': 'user', 'content': user_message})
         
         # Generate reply
-        response = generate_reply(
+        response = await generate_reply(
             conversation_history=self.history,
-            lead_info=self.lead
+            lead_info=self.lead,
+            summary=self.conversation.get('summary')
         )
+        if not response:
+            return None
         
-        if response:
-            add_message(self.conversation['id'], 'assistant', response)
-            increment_message_count(self.lead['id'])
-        
+        self.history.append({'role': 'assistant', 'content': response})
+        self._pending_reply = {
+            'user_message': user_message,
+            'response': response,
+            'score_delta': score_delta,
+            'new_state': new_state,
+            'rejection': False,
+        }
         return response
     
-    def _handle_rejection(self) -> str:
-        """Handle rejection - polite exit and kill-switch check"""
+    async def commit_reply(self):
+        """Persist the reply prepared by process_user_reply (after it was sent)"""
+        pending, self._pending_reply = self._pending_reply, None
+        if not pending:
+            return
+        
+        if pending['rejection']:
+            apply_reply_transaction(
+                self.lead['id'], self.conversation['id'], self.username,
+                pending['user_message'], None, pending['score_delta'], None, reset_rej=False
+            )
+            self._handle_rejection()
+            return
+        
+        # Save messages, score, rejection reset and state in one transaction
+        apply_reply_transaction(
+            self.lead['id'], self.conversation['id'], self.username,
+            pending['user_message'], pending['response'], pending['score_delta'],
+            pending['new_state'], reset_rej=True
+        )
+        await self._refresh_summary()
+    
+    async def _refresh_summary(self):
+        """Re-summarize older turns every SUMMARY_EVERY_TURNS bot messages"""
+        if len(self.history) <= REPLY_HISTORY_TURNS:
+            return
+        
+        # Bot messages so far, including the reply just committed
+        turns = self.get_message_count() + 1
+        if turns % SUMMARY_EVERY_TURNS:
+            return
+        
+        summary = await summarize_conversation(self.history, self.conversation.get('summary') or "")
+        if summary:
+            update_conversation_summary(self.conversation['id'], summary)
+            self.conversation['summary'] = summary
+    
+    def _handle_rejection(self):
+        """Handle rejection (after the polite exit was sent) - kill-switch check"""
         # Increment rejection counter
         rejection_count = increment_rejections(self.username)
         
@@ -161,14 +245,11 @@ class ConversationManager:
         
         # Check for kill-switch trigger
         if rejection_count >= CONSECUTIVE_REJECTIONS_LIMIT:
-            print(f"🛑 Kill-switch triggered: {rejection_count} consecutive rejections")
+            log.warning(f"🛑 Kill-switch triggered: {rejection_count} consecutive rejections")
             pause_bot(KILL_SWITCH_DURATION)
         
-        # Generate polite exit
-        exit_message = "Tushundim, vaqt ajratganingiz uchun rahmat."
-        add_message(self.conversation['id'], 'assistant', exit_message)
-        
-        return exit_message
+        # Polite exit that was sent
+        add_message(self.conversation['id'], 'assistant', self.EXIT_MESSAGE)
     
     def _exit_politely(self):
         """Exit conversation politely due to low score"""
@@ -0,0 +1,43 @@
+"""
+Username Filters
+Cheap heuristics that drop obviously personal handles before scraping
+"""
+import re
+from collections import Counter
+
+
+# Personal-account patterns: user12345, ali2003999
+_NAME_WITH_NUMBERS = re.compile(r'^[a-z]+\d{4,}$')
+
+MIN_USERNAME_LENGTH = 4
+
+
+def new_filter_stats() -> Counter:
+    """Fresh per-run counter of how often each rule fired (for tuning the heuristics)"""
+    return Counter()
+
+
+def is_probably_business_username(username: str, hits: Counter) -> bool:
+    """Return False for handles that are very unlikely to be businesses (counted in hits)"""
+    u = username.lower()
+
+    if len(u) < MIN_USERNAME_LENGTH:
+        reason = 'too_short'
+    elif u.isdigit():
+        reason = 'all_digits'
+    elif '__' in u:
+        reason = 'double_underscore'
+    elif _NAME_WITH_NUMBERS.match(u):
+        reason = 'name_with_numbers'
+    else:
+        return True
+
+    hits[reason] += 1
+    return False
+
+
+def filter_stats(hits: Counter) -> str:
+    """Human-readable summary of one run's filter hits"""
+    if not hits:
+        return "no usernames filtered"
+    return ", ".join(f"{reason}: {count}" for reason, count in hits.most_common())
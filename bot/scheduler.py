@@ -2,14 +2,26 @@
 Bot Scheduler
 Handles automation, rate limiting, and periodic tasks
 """
+import logging
+import asyncio
 import time
 import random
-from datetime import datetime
+from datetime import datetime, date
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Optional
 
 from config import (
-    DM_LIMITS,
+    dm_limit,
     INBOX_CHECK_MIN,
-    INBOX_CHECK_MAX
+    INBOX_CHECK_MAX,
+    GEMINI_CONCURRENCY,
+    BATCH_NICHE_SIZE,
+    FIRST_MESSAGE_PREFETCH,
+    SCRAPE_RECORD_TTL_DAYS,
+    DISCOVERY_WORKERS,
+    PIPELINE_QUEUE_SIZE
 )
 from database.models import (
     init_database,
@@ -18,118 +30,234 @@ from database.models import (
     get_account_age_days,
     increment_dm_count,
     get_leads_by_status,
-    add_lead
+    add_leads_bulk,
+    get_scrape_record,
+    upsert_scrape_record
 )
-from instagram.client import get_instagram_client
-from instagram.scraper import scrape_lead
+from instagram.client import get_instagram_client, NotReadyError
+from instagram.scraper import scrape_lead, scrape_leads_from_list
+from ai.gemini_client import detect_niches_batch
 from bot.conversation_manager import get_conversation_manager
+from bot.filters import is_probably_business_username, new_filter_stats, filter_stats
+
+log = logging.getLogger("instabot")
+
+
+@lru_cache(maxsize=4)
+def _daily_limit_for(day_ordinal: int) -> int:
+    """DM limit for a given day (account age only changes once a day)"""
+    return dm_limit(get_account_age_days())
 
 
 def get_daily_dm_limit() -> int:
     """Get DM limit based on account age (gradual warmup)"""
-    days = get_account_age_days()
-    
-    for (min_day, max_day), limit in DM_LIMITS.items():
-        if min_day <= days <= max_day:
-            return limit
-    
-    return 8  # Default safe limit
+    return _daily_limit_for(date.today().toordinal())
+
+
+# How often a task waiting for the next send slot re-checks the client
+SEND_POLL_INTERVAL = 5  # seconds
+
+# Short read-through cache for today's DM count (refreshed on every send)
+DM_COUNT_TTL = 10  # seconds
+_dm_count_cache = {'value': 0, 'expires_at': 0.0}
+
+
+def _dm_count_today() -> int:
+    """Today's DM count, re-read from the database at most every DM_COUNT_TTL seconds"""
+    now = time.monotonic()
+    if now >= _dm_count_cache['expires_at']:
+        _dm_count_cache['value'] = get_dm_count_today()
+        _dm_count_cache['expires_at'] = now + DM_COUNT_TTL
+    return _dm_count_cache['value']
+
+
+# DMs promised to inbox replies that are still being generated or sent;
+# new-lead sends leave this much of the daily budget untouched
+_reserved_dms = {'value': 0}
+
+
+def _dm_budget_left() -> int:
+    """DMs still available today after sends and reservations"""
+    return get_daily_dm_limit() - _dm_count_today() - _reserved_dms['value']
 
 
-def can_send_dm() -> bool:
-    """Check if bot can send a DM (rate limiting + pause check)"""
+def _release_reservation(count: int = 1):
+    """Give reserved DMs back to the shared budget"""
+    _reserved_dms['value'] -= count
+
+
+def _record_dm_sent():
+    """Increment today's DM count and invalidate the cached value"""
+    increment_dm_count()
+    _dm_count_cache['expires_at'] = 0.0
+
+
+def can_send_dm(reserved: bool = False) -> bool:
+    """
+    Check if bot can send a DM (rate limiting + pause check).
+    reserved=True: the caller already holds a reservation, so other
+    reservations don't count against it.
+    """
     # Check kill-switch
     if is_bot_paused():
-        print("⏸️ Bot is paused (kill-switch active)")
+        log.info("⏸️ Bot is paused (kill-switch active)")
         return False
     
     # Check daily limit
-    sent_today = get_dm_count_today()
+    sent_today = _dm_count_today()
     limit = get_daily_dm_limit()
+    if not reserved:
+        limit -= _reserved_dms['value']
     
     if sent_today >= limit:
-        print(f"📊 Daily limit reached: {sent_today}/{limit}")
+        log.info(f"📊 Daily limit reached: {sent_today}/{limit}")
         return False
     
-    print(f"📊 DM count: {sent_today}/{limit}")
+    log.info(f"📊 DM count: {sent_today}/{limit}")
     return True
 
 
-def process_new_leads():
+async def _send_when_ready(client, username: str, message: str, reserved: bool = False) -> Optional[bool]:
+    """
+    Send a DM as soon as the client's anti-ban gap allows, yielding to other
+    work (inbox, drafting) meanwhile. Returns None if the daily limit was hit.
+    """
+    while True:
+        wait = client.seconds_until_ready()
+        if wait > 0:
+            await asyncio.sleep(min(wait, SEND_POLL_INTERVAL))
+            continue
+        if not can_send_dm(reserved):
+            return None
+        try:
+            return await asyncio.wrap_future(client.send_dm(username, message))
+        except NotReadyError:
+            continue  # Another task took the slot first
+
+
+async def _draft_first_messages(leads: list, queue: asyncio.Queue):
+    """Producer: generate first messages ahead of the sender"""
+    for lead in leads:
+        manager = get_conversation_manager(lead['username'])
+        message = await manager.draft_first_message()
+        await queue.put((manager, message))
+    await queue.put(None)
+
+
+async def process_new_leads():
     """Send first message to new leads"""
     if not can_send_dm():
         return
     
     client = get_instagram_client()
     if not client.logged_in:
-        if not client.login():
+        if not await asyncio.to_thread(client.login):
             return
     
-    # Get leads that haven't been contacted
-    new_leads = get_leads_by_status('new')
+    # Get leads that haven't been contacted (only as many as we can send today)
+    remaining = _dm_budget_left()
+    if remaining <= 0:
+        # Budget is fully used or reserved for inbox replies
+        return
+    new_leads = get_leads_by_status('new', limit=max(0, remaining) + 5)
     
-    for lead in new_leads:
-        if not can_send_dm():
-            break
-        
-        username = lead['username']
-        print(f"\n📤 Processing lead: {username}")
-        
-        manager = get_conversation_manager(username)
-        message = manager.generate_first_message()
-        
-        if message:
-            success = client.send_dm(username, message)
-            if success:
-                increment_dm_count()
-                print(f"✅ First message sent to {username}")
-            else:
-                print(f"❌ Failed to send to {username}")
-        
-        # Random delay between leads
-        delay = random.uniform(30, 90)
-        print(f"⏳ Waiting {delay:.0f}s before next lead...")
-        time.sleep(delay)
+    # Next messages are generated while the current lead is sent and waited on
+    queue = asyncio.Queue(maxsize=FIRST_MESSAGE_PREFETCH)
+    producer = asyncio.create_task(_draft_first_messages(new_leads, queue))
+    
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            if not can_send_dm():
+                break
+            
+            manager, message = item
+            username = manager.username
+            log.info(f"\n📤 Processing lead: {username}")
+            
+            if message:
+                success = await _send_when_ready(client, username, message)
+                if success is None:
+                    break
+                manager.record_first_message(message)
+                if success:
+                    _record_dm_sent()
+                    log.info(f"✅ First message sent to {username}")
+                else:
+                    log.error(f"❌ Failed to send to {username}")
+    finally:
+        producer.cancel()
+
+
+async def _prepare_reply(msg: dict, semaphore: asyncio.Semaphore) -> Optional[tuple]:
+    """
+    Run scoring + Gemini reply generation for one inbox message.
+    Returns (manager, response); nothing is saved until manager.commit_reply().
+    """
+    username = msg['username']
+    user_message = msg['message']
+    
+    log.info(f"\n💬 Reply from {username}: {user_message[:50]}...")
+    
+    manager = get_conversation_manager(username)
+    
+    if not manager.should_respond():
+        log.info(f"⏭️ Skipping {username} (should not respond)")
+        return None
+    
+    async with semaphore:
+        response = await manager.process_user_reply(user_message)
+    return (manager, response) if response else None
 
 
-def process_inbox():
+async def process_inbox():
     """Check inbox and respond to messages"""
     client = get_instagram_client()
     if not client.logged_in:
-        if not client.login():
+        if not await asyncio.to_thread(client.login):
             return
     
-    print("\n📥 Checking inbox...")
-    unread = client.get_unread_messages()
+    log.info("\n📥 Checking inbox...")
+    unread = await asyncio.to_thread(client.get_unread_messages)
     
-    for msg in unread:
-        if not can_send_dm():
-            break
-        
-        username = msg['username']
-        user_message = msg['message']
-        
-        print(f"\n💬 Reply from {username}: {user_message[:50]}...")
-        
-        manager = get_conversation_manager(username)
-        
-        if not manager.should_respond():
-            print(f"⏭️ Skipping {username} (should not respond)")
-            continue
-        
-        response = manager.process_user_reply(user_message)
+    if not can_send_dm():
+        return
+    
+    # Reserve budget for the replies before generating them, so concurrent
+    # first messages can't use it up while Gemini is still working
+    unread = unread[:max(_dm_budget_left(), 0)]
+    held = len(unread)
+    _reserved_dms['value'] += held
+    
+    try:
+        # Generate all replies concurrently (bounded), then send them one by one
+        semaphore = asyncio.Semaphore(GEMINI_CONCURRENCY)
+        prepared = await asyncio.gather(*(_prepare_reply(msg, semaphore) for msg in unread))
         
-        if response:
-            success = client.send_dm(username, response)
+        for msg, item in zip(unread, prepared):
+            if not item:
+                _release_reservation()
+                held -= 1
+                continue
+            
+            manager, response = item
+            username = msg['username']
+            success = await _send_when_ready(client, username, response, reserved=True)
+            if success is None:
+                break
+            _release_reservation()
+            held -= 1
             if success:
-                increment_dm_count()
-                print(f"✅ Reply sent to {username}")
+                _record_dm_sent()
+                # Only a delivered reply changes state; an unsent one is redone next poll
+                await manager.commit_reply()
+                log.info(f"✅ Reply sent to {username}")
             else:
-                print(f"❌ Failed to reply to {username}")
-        
-        # Delay between replies
-        delay = random.uniform(20, 60)
-        time.sleep(delay)
+                log.error(f"❌ Failed to reply to {username}")
+    finally:
+        _release_reservation(held)
 
 
 def get_random_interval() -> int:
@@ -137,118 +265,181 @@ def get_random_interval() -> int:
     return random.randint(INBOX_CHECK_MIN, INBOX_CHECK_MAX)
 
 
-def run_scheduler():
-    """Main scheduler loop"""
-    print("🤖 Starting Instagram DM Bot Scheduler")
-    print(f"📊 Daily limit: {get_daily_dm_limit()} DMs")
-    
+async def _scheduler_loop():
+    """Async main loop: new leads, inbox, then sleep"""
     client = get_instagram_client()
-    if not client.login():
-        print("❌ Failed to login, exiting")
+    if not await asyncio.to_thread(client.login):
+        log.error("❌ Failed to login, exiting")
         return
     
     while True:
         try:
             # Check if paused
             if is_bot_paused():
-                print("⏸️ Bot is paused, waiting...")
-                time.sleep(3600)  # Check again in 1 hour
+                log.info("⏸️ Bot is paused, waiting...")
+                await asyncio.sleep(3600)  # Check again in 1 hour
                 continue
             
-            # Process new leads (send first messages)
-            process_new_leads()
-            
-            # Process inbox (reply to messages)
-            process_inbox()
+            # New leads (first messages) and inbox replies run side by side;
+            # the client's send gap paces DMs across both
+            await asyncio.gather(process_new_leads(), process_inbox())
             
             # Wait random interval
             interval = get_random_interval()
-            print(f"\n⏳ Next check in {interval // 60} minutes...")
-            time.sleep(interval)
+            log.info(f"\n⏳ Next check in {interval // 60} minutes...")
+            await asyncio.sleep(interval)
             
-        except KeyboardInterrupt:
-            print("\n👋 Shutting down...")
-            break
         except Exception as e:
-            print(f"❌ Error in scheduler: {e}")
-            time.sleep(300)  # Wait 5 min on error
+            log.error(f"❌ Error in scheduler: {e}")
+            await asyncio.sleep(300)  # Wait 5 min on error
+
+
+def run_scheduler():
+    """Main scheduler entry point (blocking)"""
+    log.info("🤖 Starting Instagram DM Bot Scheduler")
+    log.info(f"📊 Daily limit: {get_daily_dm_limit()} DMs")
+    
+    try:
+        asyncio.run(_scheduler_loop())
+    except KeyboardInterrupt:
+        log.info("\n👋 Shutting down...")
 
 
 def add_leads_from_list(usernames: list):
     """Add leads from a list of usernames (with scraping)"""
     client = get_instagram_client()
     if not client.login():
-        print("❌ Failed to login")
+        log.error("❌ Failed to login")
         return
     
+    scrape_leads_from_list(usernames)
+
+
+def _recently_scraped(username: str) -> bool:
+    """True if discovery already analyzed this username within the TTL"""
+    record = get_scrape_record(username)
+    if not record:
+        return False
+    return record['scraped_at'] > time.time() - SCRAPE_RECORD_TTL_DAYS * 24 * 60 * 60
+
+
+# ============== DISCOVERY PIPELINE ==============
+# scrape -> niche -> persist, connected by small bounded queues: Instagram
+# scraping keeps going while Gemini and DB work for earlier leads is in flight.
+
+_PIPELINE_DONE = None  # Queue sentinel
+
+
+async def _scrape_stage(usernames, skip: frozenset, out_q: asyncio.Queue):
+    """Stage 1: fetch profiles (in a worker thread) and pass on business accounts"""
+    # Per run: discovery pipelines can run side by side
+    filter_hits = new_filter_stats()
     for username in usernames:
-        print(f"\n📊 Scraping {username}...")
-        lead_data = scrape_lead(username)
+        if username in skip:
+            continue
+        if not is_probably_business_username(username, filter_hits):
+            log.info(f"⏭️ Skipping {username} (personal-looking username)")
+            continue
+        if _recently_scraped(username):
+            log.info(f"⏭️ Skipping {username} (already analyzed)")
+            continue
         
-        if lead_data:
-            add_lead(
-                username=lead_data['username'],
-                bio=lead_data.get('bio', ''),
-                last_post_topic=lead_data.get('last_post_topic', ''),
-                niche=lead_data.get('niche', 'business')
-            )
-            print(f"✅ Added lead: {username} ({lead_data.get('niche')})")
+        log.info(f"📊 Analyzing: {username}...")
+        lead_data = await asyncio.to_thread(scrape_lead, username, False)
+        
+        if lead_data and lead_data.is_business:
+            await out_q.put(lead_data)
         else:
-            print(f"⚠️ Failed to scrape {username}")
+            if lead_data:
+                upsert_scrape_record(username, int(time.time()), False)
+            reason = "not business/private" if lead_data else "scraping failed"
+            log.info(f"⏭️ Skipping {username} ({reason})")
         
-        # Delay between scrapes
-        time.sleep(random.uniform(3, 8))
+        # Human-like delay between leads to avoid blocks
+        await asyncio.sleep(random.uniform(10, 20))
+    
+    log.info(f"🔎 Username filter: {filter_stats(filter_hits)}")
+    await out_q.put(_PIPELINE_DONE)
+
+
+async def _niche_stage(in_q: asyncio.Queue, out_q: asyncio.Queue):
+    """Stage 2: detect niches in batches of up to BATCH_NICHE_SIZE leads"""
+    buffer = []
+    done = False
+    while not done:
+        lead_data = await in_q.get()
+        if lead_data is _PIPELINE_DONE:
+            done = True
+        else:
+            buffer.append(lead_data)
+        
+        if buffer and (done or len(buffer) >= BATCH_NICHE_SIZE):
+            niches = await detect_niches_batch(buffer)
+            await out_q.put(list(zip(buffer, niches)))
+            buffer = []
+    
+    await out_q.put(_PIPELINE_DONE)
+
+
+async def _persist_stage(in_q: asyncio.Queue) -> int:
+    """Stage 3: save each batch of business leads (and scrape records) in one transaction"""
+    added = 0
+    while (batch := await in_q.get()) is not _PIPELINE_DONE:
+        now = int(time.time())
+        for lead_data, niche in batch:
+            upsert_scrape_record(lead_data.username, now, True, niche)
+        add_leads_bulk([
+            (lead_data.username, lead_data.bio, lead_data.last_post_topic, niche)
+            for lead_data, niche in batch
+        ])
+        for lead_data, niche in batch:
+            log.info(f"✅ Added BUSINESS lead: {lead_data.username} ({niche})")
+        added += len(batch)
+    return added
+
+
+async def _run_discovery_pipeline(usernames, skip: frozenset = frozenset()) -> int:
+    """Run candidates through scrape -> niche -> persist, returns number of leads added"""
+    scraped_q = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    niche_q = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    _, _, added = await asyncio.gather(
+        _scrape_stage(usernames, skip, scraped_q),
+        _niche_stage(scraped_q, niche_q),
+        _persist_stage(niche_q)
+    )
+    return added
 
 
 def scrape_followers_of_user(target_username: str, amount: int = 50):
     """Scrape leads from an influencer's followers and likers"""
     client = get_instagram_client()
     if not client.login():
-        print("❌ Failed to login")
+        log.error("❌ Failed to login")
         return
     
-    combined_leads = []
+    # Deduplicated as we go
+    unique_leads: set = set()
     
     # Try followers
-    print(f"\n🔍 Step 1: Fetching followers of {target_username}...")
-    combined_leads.extend(client.get_user_followers(target_username, amount=amount // 2))
+    log.info(f"\n🔍 Step 1: Fetching followers of {target_username}...")
+    unique_leads.update(client.get_user_followers(target_username, amount=amount // 2))
     
     # Try likers (often more active/public)
-    print(f"🔍 Step 2: Fetching post likers of {target_username}...")
-    combined_leads.extend(client.get_post_likers(target_username, amount=amount // 2))
+    log.info(f"🔍 Step 2: Fetching post likers of {target_username}...")
+    unique_leads.update(client.get_post_likers(target_username, amount=amount // 2))
     
-    # Remove duplicates
-    unique_leads = list(set(combined_leads))
-    print(f"👥 Found {len(unique_leads)} potential unique leads.")
+    log.info(f"👥 Found {len(unique_leads)} potential unique leads.")
     
     if not unique_leads:
-        print("⚠️ No leads found. Check if the account is public or if you are rate-limited.")
+        log.warning("⚠️ No leads found. Check if the account is public or if you are rate-limited.")
+        client.commit_follower_cursor(target_username)
         return
 
-    added_count = 0
-    for username in unique_leads:
-        print(f"📊 Analyzing: {username}...")
-        
-        # Scrape and filter
-        lead_data = scrape_lead(username)
-        
-        if lead_data and lead_data.get('is_business'):
-            add_lead(
-                username=lead_data['username'],
-                bio=lead_data.get('bio', ''),
-                last_post_topic=lead_data.get('last_post_topic', ''),
-                niche=lead_data.get('niche', 'business')
-            )
-            print(f"✅ Added BUSINESS lead: {username}")
-            added_count += 1
-        else:
-            reason = "not business/private" if lead_data else "scraping failed"
-            print(f"⏭️ Skipping {username} ({reason})")
-        
-        # Human-like delay between leads to avoid blocks
-        time.sleep(random.uniform(10, 20))
+    added_count = asyncio.run(_run_discovery_pipeline(unique_leads))
+    # Whole chunk processed: the next run may continue past it
+    client.commit_follower_cursor(target_username)
     
-    print(f"\n✨ Finished! Added {added_count} active leads from {target_username}")
+    log.info(f"\n✨ Finished! Added {added_count} active leads from {target_username}")
 
 
 def discover_new_leads(query: str = None, amount: int = 50):
@@ -258,7 +449,7 @@ def discover_new_leads(query: str = None, amount: int = 50):
     """
     client = get_instagram_client()
     if not client.login():
-        print("❌ Failed to login")
+        log.error("❌ Failed to login")
         return
     
     # 1. Seed accounts (Top Uzbek business figures)
@@ -272,58 +463,46 @@ def discover_new_leads(query: str = None, amount: int = 50):
     if query and not " " in query:
         seeds.insert(0, query)
 
-    print(f"\n🌳 Starting Discovery Tree from {len(seeds)} seed accounts...")
+    log.info(f"\n🌳 Starting Discovery Tree from {len(seeds)} seed accounts...")
     
-    potential_usernames = []
+    added_count = asyncio.run(_discover_from_seeds(client, seeds, amount))
+    log.info(f"\n✨ Discovery finished! Added {added_count} business leads")
+
+
+async def _discover_from_seeds(client, seeds: list, amount: int) -> int:
+    """Expand the suggestion tree from seeds, then analyze the candidates"""
+    # Deduplicated as we go
+    potential_usernames: set = set()
     
     # Track who we already expanded to avoid loops
     expanded_seeds = set()
     
     for seed in seeds[:3]: # Limit seeds per run to avoid blocks
-        print(f"📍 Expanding from seed: {seed}...")
+        log.info(f"📍 Expanding from seed: {seed}...")
         
         # Get suggestions
-        suggestions = client.get_suggested_users(seed, amount=20)
-        potential_usernames.extend(suggestions)
+        suggestions = await asyncio.to_thread(client.get_suggested_users, seed, 20)
+        potential_usernames.update(suggestions)
         expanded_seeds.add(seed)
         
         # Deep expansion (Step 2)
         if len(potential_usernames) < amount:
             for sub_seed in suggestions[:3]:
                 if sub_seed not in expanded_seeds:
-                    print(f"  └─ Deep expansion: {sub_seed}...")
-                    sub_suggestions = client.get_suggested_users(sub_seed, amount=10)
-                    potential_usernames.extend(sub_suggestions)
+                    log.info(f"  └─ Deep expansion: {sub_seed}...")
+                    sub_suggestions = await asyncio.to_thread(client.get_suggested_users, sub_seed, 10)
+                    potential_usernames.update(sub_suggestions)
                     expanded_seeds.add(sub_seed)
-                    time.sleep(random.uniform(5, 10))
+                    await asyncio.sleep(random.uniform(5, 10))
     
-    # Deduplicate
-    unique_usernames = list(set(potential_usernames))
-    print(f"✅ Discovery phase complete. Found {len(unique_usernames)} unique profiles to analyze.")
-    
-    added_count = 0
-    for username in unique_usernames[:amount]:
-        if username in seeds: continue # Skip seeds
-        
-        print(f"📊 Analyzing: {username}...")
-        lead_data = scrape_lead(username)
-        
-        if lead_data and lead_data.get('is_business'):
-            add_lead(
-                username=lead_data['username'],
-                bio=lead_data.get('bio', ''),
-                last_post_topic=lead_data.get('last_post_topic', ''),
-                niche=lead_data.get('niche', 'business')
-            )
-            print(f"✅ Added BUSINESS lead: {username}")
-            added_count += 1
-        else:
-            reason = "not business/private" if lead_data else "scraping failed"
-            print(f"⏭️ Skipping {username} ({reason})")
-        
-        # Protect account
-        time.sleep(random.uniform(10, 20))
+    log.info(f"✅ Discovery phase complete. Found {len(potential_usernames)} unique profiles to analyze.")
     
+    return await _run_discovery_pipeline(
+        islice(potential_usernames, amount),
+        skip=frozenset(seeds)  # Skip seeds
+    )
+
+
 def discover_all_uzbek_businesses(amount_per_source: int = 20):
     """
     Broad discovery cycling through top Uzbek business influencers.
@@ -337,15 +516,24 @@ def discover_all_uzbek_businesses(amount_per_source: int = 20):
         'jahongir_artikhodjayev_official', 'murod_nazarov_official'
     ]
     
-    print(f"\n🌍 Starting Global Uzbek Business Discovery ({len(influencers)} sources)...")
+    log.info(f"\n🌍 Starting Global Uzbek Business Discovery ({len(influencers)} sources)...")
     
-    for influencer in influencers:
-        print(f"\n🎬 Source: @{influencer}")
+    # Log in once up front so the workers don't race each other into _login
+    if not get_instagram_client().login():
+        log.error("❌ Failed to login")
+        return
+    
+    def scrape_source(influencer: str):
+        log.info(f"\n🎬 Source: @{influencer}")
         scrape_followers_of_user(influencer, amount=amount_per_source)
         
-        # Long delay between sources to stay safe
+        # Long delay between sources to stay safe (per worker)
         wait_time = random.uniform(30, 60)
-        print(f"⏳ Waiting {wait_time:.1f}s before next source...")
+        log.info(f"⏳ Waiting {wait_time:.1f}s before next source...")
         time.sleep(wait_time)
     
-    print("\n✨ Global discovery cycle complete!")
+    # A couple of sources in parallel; Instagram calls are serialized by the client lock
+    with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+        list(executor.map(scrape_source, influencers))
+    
+    log.info("\n✨ Global discovery cycle complete!")
@@ -3,14 +3,44 @@ Cookie debugger - barcha cookie'larni ko'rsatadi
 """
 from playwright.sync_api import sync_playwright
 import json
+import os
+import sys
 from pathlib import Path
 from urllib.parse import unquote
 
 DATA_DIR = Path(__file__).parent / "data"
 SESSION_FILE = DATA_DIR / "session.json"
 
+# Session faylining o'zgarmas qismi (qurilma ma'lumotlari)
+_STATIC_SESSION_TEMPLATE = {
+    "uuids": {
+        "phone_id": "a1b2c3d4-e5f6-7890-abcd-ef1234567890",
+        "uuid": "12345678-1234-1234-1234-123456789012",
+        "client_session_id": "session",
+        "advertising_id": "ad-id",
+        "android_device_id": "android_1234567890abcdef",
+        "request_id": "request"
+    },
+    "device_settings": {
+        "app_version": "269.0.0.18.75",
+        "android_version": 26,
+        "android_release": "8.0.0",
+        "dpi": "480dpi",
+        "resolution": "1080x1920",
+        "manufacturer": "samsung",
+        "device": "SM-G950F",
+        "model": "star2lte",
+        "cpu": "exynos8895",
+        "version_code": "314665256"
+    },
+    "user_agent": "Instagram 269.0.0.18.75 Android"
+}
 
-def debug_cookies():
+# Muhim cookie'lar (alohida ko'rsatiladi)
+_KEY_COOKIES = frozenset({'sessionid', 'csrftoken', 'ds_user_id', 'mid', 'rur', 'ig_did'})
+
+
+def debug_cookies(pretty: bool = False):
     print("""
 ╔═══════════════════════════════════════════════════════════╗
 ║          Cookie Debug - barcha cookie'larni ko'rsatish   ║
@@ -39,18 +69,12 @@ def debug_cookies():
         
         print(f"\n📋 Jami {len(cookies)} ta cookie topildi:\n")
         
-        session_data = {"cookies": {}}
+        session_data = {"cookies": {c['name']: c['value'] for c in cookies}}
         
-        for cookie in cookies:
-            name = cookie['name']
-            value = cookie['value']
-            domain = cookie.get('domain', '')
-            
-            # Muhim cookie'larni ajratib ko'rsatamiz
-            if name in ['sessionid', 'csrftoken', 'ds_user_id', 'mid', 'rur', 'ig_did']:
-                print(f"  ⭐ {name}: {value[:50]}..." if len(value) > 50 else f"  ⭐ {name}: {value}")
-            
-            session_data["cookies"][name] = value
+        # Muhim cookie'larni ajratib ko'rsatamiz
+        for name in _KEY_COOKIES & session_data["cookies"].keys():
+            value = session_data["cookies"][name]
+            print(f"  ⭐ {name}: {value[:50]}..." if len(value) > 50 else f"  ⭐ {name}: {value}")
         
         # Maxsus session ma'lumotlarini olish
         session_id = session_data["cookies"].get('sessionid')
@@ -65,14 +89,7 @@ def debug_cookies():
         if session_id:
             # To'liq session yaratish
             full_session = {
-                "uuids": {
-                    "phone_id": "a1b2c3d4-e5f6-7890-abcd-ef1234567890",
-                    "uuid": "12345678-1234-1234-1234-123456789012",
-                    "client_session_id": "session",
-                    "advertising_id": "ad-id",
-                    "android_device_id": "android_1234567890abcdef",
-                    "request_id": "request"
-                },
+                **_STATIC_SESSION_TEMPLATE,
                 "mid": session_data["cookies"].get("mid", ""),
                 "ig_u_rur": session_data["cookies"].get("rur"),
                 "ig_www_claim": None,
@@ -81,24 +98,18 @@ def debug_cookies():
                     "sessionid": unquote(session_id) if session_id else ""
                 },
                 "cookies": session_data["cookies"],
-                "last_login": None,
-                "device_settings": {
-                    "app_version": "269.0.0.18.75",
-                    "android_version": 26,
-                    "android_release": "8.0.0",
-                    "dpi": "480dpi",
-                    "resolution": "1080x1920",
-                    "manufacturer": "samsung",
-                    "device": "SM-G950F",
-                    "model": "star2lte",
-                    "cpu": "exynos8895",
-                    "version_code": "314665256"
-                },
-                "user_agent": "Instagram 269.0.0.18.75 Android"
+                "last_login": None
             }
             
-            with open(SESSION_FILE, 'w') as f:
-                json.dump(full_session, f, indent=2)
+            # Compact JSON (bot reads it, not a human); --pretty for inspection.
+            # Write to a temp file and swap it in so a crash never leaves half a session
+            tmp_file = SESSION_FILE.with_suffix(".tmp")
+            with open(tmp_file, 'w') as f:
+                if pretty:
+                    json.dump(full_session, f, indent=2)
+                else:
+                    json.dump(full_session, f, separators=(',', ':'))
+            os.replace(tmp_file, SESSION_FILE)
             
             print(f"\n✅ Session saqlandi: {SESSION_FILE}")
             print("\n🚀 Endi 'python main.py run' bilan botni ishga tushiring!")
@@ -114,4 +125,4 @@ def debug_cookies():
 
 
 if __name__ == "__main__":
-    debug_cookies()
+    debug_cookies(pretty="--pretty" in sys.argv)
@@ -3,13 +3,28 @@ Instagram DM Bot Configuration
 Environment variables va global settings
 """
 import os
+import sys
+import logging
+from bisect import bisect_left
 from dotenv import load_dotenv
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 
 # Load environment variables
 load_dotenv()
 
+# ============== LOGGING ==============
+# Every module logs to "instabot". This default handler prints straight to stdout,
+# so scripts and direct imports (no main.setup_logging) still see INFO messages.
+log = logging.getLogger("instabot")
+if not log.handlers:
+    _console = logging.StreamHandler(sys.stdout)
+    _console.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_console)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
 # ============== API CREDENTIALS ==============
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 INSTAGRAM_USERNAME = os.getenv("INSTAGRAM_USERNAME", "")
@@ -19,31 +34,75 @@ INSTAGRAM_PASSWORD = os.getenv("INSTAGRAM_PASSWORD", "")
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 SESSION_FILE = DATA_DIR / "session.json"
-DATABASE_FILE = DATA_DIR / "leads.db"
+DATABASE_FILE = DATA_DIR / "leads.db"  # WAL mode: leads.db-wal / leads.db-shm appear alongside
 DATABASE_URL = os.getenv("DATABASE_URL", "") # Neon PostgreSQL URL
 
 # Ensure data directory exists
 DATA_DIR.mkdir(exist_ok=True)
 
 # ============== RATE LIMITING (Gradual Warmup) ==============
-# Day ranges and their DM limits
-DM_LIMITS = {
-    (1, 3): 8,      # Days 1-3: max 8 DMs
-    (4, 7): 15,     # Days 4-7: max 15 DMs
-    (8, 14): 25,    # Days 8-14: max 25 DMs
-    (15, 999): 40,  # 15+ days: max 40 DMs
-}
+# Day ranges and their DM limits: upper day of each range -> limit
+_DM_UPPER = [3, 7, 14, 999]   # Days 1-3, 4-7, 8-14, 15+
+_DM_LIMIT = [8, 15, 25, 40]
+DM_LIMIT_DEFAULT = 8          # Safe limit outside the known ranges
+
+
+def dm_limit(age_days: int) -> int:
+    """DM limit for an account age in days"""
+    i = bisect_left(_DM_UPPER, age_days)
+    return _DM_LIMIT[i] if i < len(_DM_LIMIT) else DM_LIMIT_DEFAULT
 
 # Inbox check interval (seconds) - random between these values
 INBOX_CHECK_MIN = 420  # 7 minutes
 INBOX_CHECK_MAX = 720  # 12 minutes
 
+# Max Gemini requests in flight at once while preparing inbox replies
+GEMINI_CONCURRENCY = 5
+
+# First messages generated ahead of the sender in process_new_leads
+FIRST_MESSAGE_PREFETCH = 3
+
+# Influencer sources scraped concurrently by discover-all (keep small for IG limits)
+DISCOVERY_WORKERS = 2
+
+# Scraped leads written per transaction by scrape_leads_from_list (also flushed on exit)
+LEAD_SAVE_BATCH = 10
+
+# Bounded queue size between discovery pipeline stages (scrape -> niche -> persist)
+PIPELINE_QUEUE_SIZE = 4
+
+# Discovery skips usernames scraped within this many days
+SCRAPE_RECORD_TTL_DAYS = 30
+
+# Niche detection cache lifetime (memory + database)
+NICHE_CACHE_TTL_DAYS = 30
+
+# Profiles per Gemini request when detecting niches in bulk discovery
+BATCH_NICHE_SIZE = 20
+
+# Reply prompt: last N messages verbatim, older ones via a rolling summary
+REPLY_HISTORY_TURNS = 6
+SUMMARY_EVERY_TURNS = 4  # Refresh the summary every N bot messages
+
+# Related-profile suggestions are reused for this long (seconds)
+SUGGESTIONS_CACHE_TTL = 6 * 60 * 60
+
+# Keyword/hashtag/location search results are reused for this long (seconds)
+SEARCH_CACHE_TTL = 30 * 60
+
+# Skip the session liveness probe if an API call succeeded this recently (seconds)
+SESSION_PROBE_TTL = 10 * 60
+
 # ============== HUMAN SIMULATION ==============
 # Typing delay formula: len(message) * TYPING_SPEED + random(DELAY_MIN, DELAY_MAX)
 TYPING_SPEED = 0.4  # seconds per character
 DELAY_MIN = 5       # minimum additional delay
 DELAY_MAX = 15      # maximum additional delay
 
+# Minimum gap between two DM attempts: random(SEND_GAP_MIN, SEND_GAP_MAX) seconds
+SEND_GAP_MIN = 30
+SEND_GAP_MAX = 90
+
 # ============== SAFETY SETTINGS ==============
 # Kill-switch: pause bot for 24h if these conditions met
 CONSECUTIVE_REJECTIONS_LIMIT = 2  # 2 "kerak emas" in a row
@@ -68,18 +127,20 @@ def get_time_of_day() -> str:
         return "evening"
 
 # ============== VALIDATION ==============
+@lru_cache(maxsize=1)
+def get_credentials() -> tuple:
+    """(GEMINI_API_KEY, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD) as read once at startup"""
+    return (GEMINI_API_KEY, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
+
+
+@lru_cache(maxsize=1)
 def validate_config() -> bool:
-    """Check if all required credentials are set"""
-    missing = []
-    if not GEMINI_API_KEY:
-        missing.append("GEMINI_API_KEY")
-    if not INSTAGRAM_USERNAME:
-        missing.append("INSTAGRAM_USERNAME")
-    if not INSTAGRAM_PASSWORD:
-        missing.append("INSTAGRAM_PASSWORD")
+    """Check if all required credentials are set (checked once per process)"""
+    names = ("GEMINI_API_KEY", "INSTAGRAM_USERNAME", "INSTAGRAM_PASSWORD")
+    missing = [name for name, value in zip(names, get_credentials()) if not value]
     
     if missing:
-        print(f"❌ Missing environment variables: {', '.join(missing)}")
-        print("Please create a .env file with these values.")
+        log.error(f"❌ Missing environment variables: {', '.join(missing)}")
+        log.info("Please create a .env file with these values.")
         return False
     return True
@@ -2,327 +2,800 @@
 Database Models and Schema
 SQLite database for leads, conversations, and messages
 """
+import logging
 import sqlite3
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import time
+import threading
+import atexit
+from contextlib import contextmanager
+from collections import deque
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, Union
+from datetime import date, datetime, timedelta
+from typing import Optional, Union, Iterator
 import json
 
 from config import DATABASE_FILE, DATABASE_URL
 
+log = logging.getLogger("instabot")
 
-def get_connection():
-    """Get database connection (PostgreSQL if DATABASE_URL set, otherwise SQLite)"""
-    if DATABASE_URL:
-        # PostgreSQL (Neon)
-        conn = psycopg2.connect(DATABASE_URL)
-        return conn, "%s" # Placeholder for PG
+
+# Backend and parameter placeholder are fixed for the process lifetime
+IS_PG = bool(DATABASE_URL)
+PH = "%s" if IS_PG else "?"
+
+
+def _today() -> str:
+    """Local date as 'YYYY-MM-DD', passed in since the database server's clock may be UTC"""
+    return date.today().isoformat()
+
+
+if IS_PG:
+    # Only loaded in PostgreSQL mode: SQLite runs never pay for libpq/OpenSSL
+    import psycopg2
+    import psycopg2.extensions
+    from psycopg2.extras import RealDictCursor, execute_values
+    from psycopg2.pool import ThreadedConnectionPool
+    
+    class _PreparedConnection(psycopg2.extensions.connection):
+        """psycopg2 connection that remembers whether hot statements were PREPAREd on it"""
+        prepared = False
+        last_used = 0.0  # time.monotonic() when it went back to the pool
+
+
+# ============== CONNECTIONS ==============
+# One pool (PostgreSQL) or one long-lived connection (SQLite) per process,
+# created on first use instead of a new connect/handshake per query.
+
+PG_POOL_MIN = 1
+PG_POOL_MAX = 10
+# Neon closes idle connections server-side (the client still sees closed == 0);
+# a pooled connection idle longer than this is pinged before use
+PG_IDLE_PING = 60  # seconds
+# libpq TCP keepalives, so dropped connections are noticed sooner
+PG_KEEPALIVES = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+}
+
+_pg_pool = None
+_sqlite_conn = None
+_init_lock = threading.Lock()
+# Serializes use of the shared SQLite connection. Reads take it too: a read
+# running on the connection mid-transaction would see (and lose, on ROLLBACK)
+# another thread's uncommitted writes. Reentrant so a read can nest in a write block.
+_sqlite_lock = threading.RLock()
+
+
+# Set by init_database(): PREPARE needs the tables to exist
+_schema_ready = False
+# SQL-level PREPARE does not survive transaction-mode PgBouncer (Neon "-pooler" hosts)
+_USE_PG_PREPARE = IS_PG and "-pooler" not in DATABASE_URL
+
+
+def _get_pg_pool() -> "ThreadedConnectionPool":
+    """Create the PostgreSQL (Neon) connection pool on first use"""
+    global _pg_pool
+    if _pg_pool is None:
+        with _init_lock:
+            if _pg_pool is None:
+                _pg_pool = ThreadedConnectionPool(
+                    PG_POOL_MIN, PG_POOL_MAX, DATABASE_URL,
+                    connection_factory=_PreparedConnection,
+                    **PG_KEEPALIVES
+                )
+    return _pg_pool
+
+
+def _checkout_pg_conn(pool):
+    """Take a live connection from the pool, pinging (and replacing) stale idle ones"""
+    for _ in range(PG_POOL_MAX):
+        conn = pool.getconn()
+        if not conn.closed and time.monotonic() - conn.last_used < PG_IDLE_PING:
+            return conn
+        try:
+            if not conn.autocommit:
+                conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return conn
+        except psycopg2.Error:
+            pool.putconn(conn, close=True)
+    # Every pooled connection was dead; the pool opens a fresh one
+    return pool.getconn()
+
+
+def _prepare_statements(conn):
+    """PREPARE the hot statements once per pooled connection (server keeps the plan)"""
+    with conn.cursor() as cursor:
+        # Start clean: a previous attempt may have failed halfway through
+        cursor.execute("DEALLOCATE ALL")
+        for name, sql in _HOT_SQL.items():
+            cursor.execute(f"PREPARE {name} AS {_to_dollar_params(sql)}")
+    conn.prepared = True
+
+
+def _to_dollar_params(sql: str) -> str:
+    """Rewrite %s placeholders as $1, $2, ... for PREPARE"""
+    parts = sql.split("%s")
+    return "".join(part + (f"${i}" if i < len(parts) else "") for i, part in enumerate(parts, 1))
+
+
+def _run(cursor, name: str, params: tuple):
+    """Execute a hot statement: EXECUTE on prepared PG connections, plain SQL otherwise"""
+    if getattr(cursor.connection, 'prepared', False):
+        cursor.execute(_PG_EXECUTE[name], params)
     else:
-        # Local SQLite
-        conn = sqlite3.connect(DATABASE_FILE)
-        conn.row_factory = sqlite3.Row
-        return conn, "?"  # Placeholder for SQLite
+        cursor.execute(_HOT_SQL[name], params)
+
+
+# WAL makes NORMAL sync safe (no fsync per commit); 64MB page cache, 256MB mmap.
+# WAL keeps leads.db-wal / leads.db-shm next to leads.db while the bot runs.
+_SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+"""
+
+
+def _get_sqlite_conn() -> sqlite3.Connection:
+    """Open the shared SQLite connection on first use"""
+    global _sqlite_conn
+    if _sqlite_conn is None:
+        with _init_lock:
+            if _sqlite_conn is None:
+                # Autocommit mode: writes open explicit BEGIN/COMMIT in db_cursor()
+                conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False, isolation_level=None)
+                conn.executescript(_SQLITE_PRAGMAS)
+                # Keep the page cache for the whole process, close cleanly on exit
+                atexit.register(conn.close)
+                _sqlite_conn = conn
+    return _sqlite_conn
+
+
+@contextmanager
+def _pg_cursor(readonly: bool = False, name: Optional[str] = None):
+    """
+    Pooled PostgreSQL cursor. Pooled connections sit in autocommit mode so reads
+    skip the implicit BEGIN/COMMIT; write blocks switch it off for one transaction.
+    A named (server-side) cursor streams rows and needs a transaction, so it
+    always takes the transactional path.
+    """
+    pool = _get_pg_pool()
+    conn = _checkout_pg_conn(pool)
+    try:
+        if not conn.autocommit:
+            conn.autocommit = True
+        if _USE_PG_PREPARE and _schema_ready and not conn.prepared:
+            try:
+                _prepare_statements(conn)
+            except psycopg2.Error:
+                # Don't pool a half-prepared connection; putconn below discards it
+                conn.close()
+                raise
+        
+        if readonly and name is None:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                yield cursor
+            return
+        
+        conn.autocommit = False
+        try:
+            with conn.cursor(name=name, cursor_factory=RealDictCursor) as cursor:
+                yield cursor
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            if not conn.closed:
+                conn.autocommit = True
+    finally:
+        conn.last_used = time.monotonic()
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+@contextmanager
+def _sqlite_cursor(readonly: bool = False, name: Optional[str] = None):
+    """
+    Cursor on the shared SQLite connection, used under the connection lock.
+    Writes run inside BEGIN/COMMIT (ROLLBACK on error); readonly blocks skip the
+    transaction. SQLite cursors already step through rows lazily, so name is ignored.
+    """
+    conn = _get_sqlite_conn()
+    if readonly:
+        with _sqlite_lock:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+        return
+    
+    with _sqlite_lock:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        try:
+            yield cursor
+            cursor.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+
 
+# ============== ROW CONVERSION ==============
+# PostgreSQL cursors already return dicts (RealDictCursor). SQLite returns
+# plain tuples; column names are read once per result set and zipped in.
 
-def get_cursor(conn):
-    """Get a cursor that returns results as dictionaries"""
-    if isinstance(conn, sqlite3.Connection):
-        return conn.cursor()
+def _fetchone_sqlite(cursor) -> Optional[dict]:
+    row = cursor.fetchone()
+    return dict(zip([d[0] for d in cursor.description], row)) if row else None
+
+
+def _fetchall_sqlite(cursor) -> list:
+    cols = [d[0] for d in cursor.description]
+    return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+
+def _iter_rows_sqlite(cursor) -> Iterator[dict]:
+    cols = [d[0] for d in cursor.description]
+    for row in cursor:
+        yield dict(zip(cols, row))
+
+
+def _fetchone_pg(cursor) -> Optional[dict]:
+    return cursor.fetchone()
+
+
+def _fetchall_pg(cursor) -> list:
+    return cursor.fetchall()
+
+
+def _iter_rows_pg(cursor) -> Iterator[dict]:
+    return iter(cursor)
+
+
+# Backend chosen once: db_cursor(readonly=False, name=None) yields a cursor on the right connection
+if IS_PG:
+    db_cursor, _fetchone, _fetchall, _iter_rows = _pg_cursor, _fetchone_pg, _fetchall_pg, _iter_rows_pg
+else:
+    db_cursor, _fetchone, _fetchall, _iter_rows = _sqlite_cursor, _fetchone_sqlite, _fetchall_sqlite, _iter_rows_sqlite
+
+
+def _create_conversation_lead_index_pg(cursor):
+    """UNIQUE index on conversations(lead_id); plain index if old data has duplicates"""
+    # A failed statement aborts the PG transaction, so isolate it
+    cursor.execute("SAVEPOINT idx_conv_lead")
+    try:
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_conv_lead ON conversations(lead_id)")
+    except psycopg2.Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT idx_conv_lead")
+        log.warning(f"⚠️ Duplicate conversations per lead, using non-unique index: {e}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_conv_lead_nonunique ON conversations(lead_id)")
     else:
-        # PostgreSQL
-        return conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("RELEASE SAVEPOINT idx_conv_lead")
+
+
+def _create_conversation_lead_index_sqlite(cursor):
+    """UNIQUE index on conversations(lead_id); plain index if old data has duplicates"""
+    try:
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_conv_lead ON conversations(lead_id)")
+    except sqlite3.IntegrityError as e:
+        log.warning(f"⚠️ Duplicate conversations per lead, using non-unique index: {e}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_conv_lead_nonunique ON conversations(lead_id)")
+
+
+def _create_updated_at_triggers_pg(cursor):
+    """Let the database maintain updated_at on leads and bot_state"""
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = CURRENT_TIMESTAMP;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in _UPDATED_AT_TABLES:
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_updated ON {table}")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_updated BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+        """)
+
+
+def _create_updated_at_triggers_sqlite(cursor):
+    """Let the database maintain updated_at on leads and bot_state"""
+    for table in _UPDATED_AT_TABLES:
+        # AFTER trigger re-stamps the row; recursive_triggers is off so it fires once
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_updated AFTER UPDATE ON {table}
+            FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+            END
+        """)
+
+
+def _migrate_pg(cursor):
+    """PostgreSQL: add columns missing from older tables, seed bot_state"""
+    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name='bot_state' AND column_name='instagram_session'")
+    if not cursor.fetchone():
+        log.info("🚀 Migrating: Adding 'instagram_session' column to Neon...")
+        cursor.execute("ALTER TABLE bot_state ADD COLUMN instagram_session TEXT")
+    
+    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name='conversations' AND column_name='summary'")
+    if not cursor.fetchone():
+        log.info("🚀 Migrating: Adding 'summary' column to Neon...")
+        cursor.execute("ALTER TABLE conversations ADD COLUMN summary TEXT")
+    
+    cursor.execute("INSERT INTO bot_state (id, total_dms_today, last_dm_date) VALUES (1, 0, %s) ON CONFLICT (id) DO NOTHING", (_today(),))
+
+
+def _migrate_sqlite(cursor):
+    """SQLite: add columns missing from older tables, seed bot_state"""
+    cursor.execute("PRAGMA table_info(bot_state)")
+    cols = [col[1] for col in cursor.fetchall()]
+    if 'instagram_session' not in cols:
+        log.info("🚀 Migrating: Adding 'instagram_session' column to SQLite...")
+        cursor.execute("ALTER TABLE bot_state ADD COLUMN instagram_session TEXT")
+    
+    cursor.execute("PRAGMA table_info(conversations)")
+    cols = [col[1] for col in cursor.fetchall()]
+    if 'summary' not in cols:
+        log.info("🚀 Migrating: Adding 'summary' column to SQLite...")
+        cursor.execute("ALTER TABLE conversations ADD COLUMN summary TEXT")
+    
+    cursor.execute("INSERT OR IGNORE INTO bot_state (id, total_dms_today, last_dm_date) VALUES (1, 0, ?)", (_today(),))
+
+
+# Tables whose updated_at column is set by a trigger, not by each UPDATE
+_UPDATED_AT_TABLES = ("leads", "bot_state")
+
+if IS_PG:
+    _ID_TYPE = "SERIAL PRIMARY KEY"
+    _create_conversation_lead_index = _create_conversation_lead_index_pg
+    _create_updated_at_triggers = _create_updated_at_triggers_pg
+    _migrate = _migrate_pg
+else:
+    _ID_TYPE = "INTEGER PRIMARY KEY AUTOINCREMENT"
+    _create_conversation_lead_index = _create_conversation_lead_index_sqlite
+    _create_updated_at_triggers = _create_updated_at_triggers_sqlite
+    _migrate = _migrate_sqlite
 
 
 def init_database():
     """Initialize database tables"""
-    conn, _ = get_connection()
-    cursor = get_cursor(conn)
+    with db_cursor() as cursor:
     
-    # Check if we are using PostgreSQL
-    is_pg = not isinstance(conn, sqlite3.Connection)
-    id_type = "SERIAL PRIMARY KEY" if is_pg else "INTEGER PRIMARY KEY AUTOINCREMENT"
+        # Leads table
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS leads (
+                id {_ID_TYPE},
+                username TEXT UNIQUE NOT NULL,
+                bio TEXT,
+                last_post_topic TEXT,
+                niche TEXT,
+                status TEXT DEFAULT 'new',
+                confidence_score INTEGER DEFAULT 0,
+                consecutive_rejections INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
     
-    # Leads table
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS leads (
-            id {id_type},
-            username TEXT UNIQUE NOT NULL,
-            bio TEXT,
-            last_post_topic TEXT,
-            niche TEXT,
-            status TEXT DEFAULT 'new',
-            confidence_score INTEGER DEFAULT 0,
-            consecutive_rejections INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+        # Conversations table
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id {_ID_TYPE},
+                lead_id INTEGER NOT NULL,
+                state TEXT DEFAULT 'new',
+                message_count INTEGER DEFAULT 0,
+                last_message_at TIMESTAMP,
+                summary TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (lead_id) REFERENCES leads(id)
+            )
+        """)
     
-    # Conversations table
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS conversations (
-            id {id_type},
-            lead_id INTEGER NOT NULL,
-            state TEXT DEFAULT 'new',
-            message_count INTEGER DEFAULT 0,
-            last_message_at TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (lead_id) REFERENCES leads(id)
-        )
-    """)
+        # Messages table
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS messages (
+                id {_ID_TYPE},
+                conversation_id INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (conversation_id) REFERENCES conversations(id)
+            )
+        """)
     
-    # Messages table
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS messages (
-            id {id_type},
-            conversation_id INTEGER NOT NULL,
-            role TEXT NOT NULL,
-            content TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (conversation_id) REFERENCES conversations(id)
-        )
-    """)
+        # Bot state table
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS bot_state (
+                id INTEGER PRIMARY KEY,
+                paused_until TIMESTAMP,
+                total_dms_today INTEGER DEFAULT 0,
+                last_dm_date DATE,
+                account_created_date DATE,
+                instagram_session TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
     
-    # Bot state table
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS bot_state (
-            id INTEGER PRIMARY KEY,
-            paused_until TIMESTAMP,
-            total_dms_today INTEGER DEFAULT 0,
-            last_dm_date DATE,
-            account_created_date DATE,
-            instagram_session TEXT,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+        # Usernames already analyzed by discovery (skip re-scraping)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scraped_usernames (
+                username TEXT PRIMARY KEY,
+                scraped_at BIGINT NOT NULL,
+                was_business INTEGER DEFAULT 0,
+                niche TEXT
+            )
+        """)
     
-    # Initialize bot state if not exists
-    if is_pg:
-        # PostgreSQL Migration: Add instagram_session if missing from existing table
-        cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name='bot_state' AND column_name='instagram_session'")
-        if not cursor.fetchone():
-            print("🚀 Migrating: Adding 'instagram_session' column to Neon...")
-            cursor.execute("ALTER TABLE bot_state ADD COLUMN instagram_session TEXT")
-            
-        cursor.execute("INSERT INTO bot_state (id, total_dms_today, last_dm_date) VALUES (1, 0, CURRENT_DATE) ON CONFLICT (id) DO NOTHING")
-    else:
-        # SQLite Migration: Add instagram_session if missing
-        cursor.execute("PRAGMA table_info(bot_state)")
-        cols = [col[1] for col in cursor.fetchall()]
-        if 'instagram_session' not in cols:
-            print("🚀 Migrating: Adding 'instagram_session' column to SQLite...")
-            cursor.execute("ALTER TABLE bot_state ADD COLUMN instagram_session TEXT")
-            
-        cursor.execute("INSERT OR IGNORE INTO bot_state (id, total_dms_today, last_dm_date) VALUES (1, 0, date('now'))")
+        # Status lookups (new-lead queue) use an index instead of a table scan
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status)")
+        
+        # One conversation per lead (also the conflict target of add_lead)
+        _create_conversation_lead_index(cursor)
+        
+        # History reads filter by conversation and sort by time straight from the index
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_msg_conv_created ON messages(conversation_id, created_at)")
+    
+        # Niche detection cache (keyed by bio/last-post content hash)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS niche_cache (
+                hash TEXT PRIMARY KEY,
+                niche TEXT NOT NULL,
+                ts BIGINT NOT NULL
+            )
+        """)
     
-    conn.commit()
-    conn.close()
-    print("✅ Database initialized")
+        # Follower pagination cursor per source account (resume scrape-followers)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS follower_cursors (
+                source_user TEXT PRIMARY KEY,
+                cursor TEXT NOT NULL
+            )
+        """)
+    
+        # Migrations + bot state row
+        _migrate(cursor)
+        
+        # updated_at is maintained by triggers
+        _create_updated_at_triggers(cursor)
+    
+    global _schema_ready
+    _schema_ready = True
+    log.info("✅ Database initialized")
 
 
 # ============== LEAD OPERATIONS ==============
 
-def add_lead(username: str, bio: str = "", last_post_topic: str = "", niche: str = "") -> int:
+def _add_lead_pg(username: str, bio: str = "", last_post_topic: str = "", niche: str = "") -> int:
     """Add a new lead to database, returns lead_id"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    is_pg = not isinstance(conn, sqlite3.Connection)
-    
-    try:
-        if is_pg:
-            cursor.execute(f"""
-                INSERT INTO leads (username, bio, last_post_topic, niche)
-                VALUES ({p}, {p}, {p}, {p})
-                ON CONFLICT (username) DO UPDATE SET updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-            """, (username, bio, last_post_topic, niche))
-            row = cursor.fetchone()
-            lead_id = row['id']
-        else:
-            cursor.execute(f"""
-                INSERT OR IGNORE INTO leads (username, bio, last_post_topic, niche)
-                VALUES ({p}, {p}, {p}, {p})
-            """, (username, bio, last_post_topic, niche))
-            if cursor.rowcount == 0:
-                # If insert ignored, lead already exists, fetch its ID
-                cursor.execute(f"SELECT id FROM leads WHERE username = {p}", (username,))
-                row = cursor.fetchone()
-                lead_id = row['id']
-            else:
-                lead_id = cursor.lastrowid
+    with db_cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO leads (username, bio, last_post_topic, niche)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (username) DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+            RETURNING id
+        """, (username, bio, last_post_topic, niche))
+        lead_id = cursor.fetchone()['id']
         
         # Create or Get conversation for this lead
-        if is_pg:
-            cursor.execute(f"""
-                INSERT INTO conversations (lead_id, state)
-                VALUES ({p}, 'new')
-                ON CONFLICT (lead_id) DO NOTHING
-            """, (lead_id,))
+        cursor.execute("""
+            INSERT INTO conversations (lead_id, state)
+            VALUES (%s, 'new')
+            ON CONFLICT (lead_id) DO NOTHING
+        """, (lead_id,))
+        
+        return lead_id
+
+
+def _add_lead_sqlite(username: str, bio: str = "", last_post_topic: str = "", niche: str = "") -> int:
+    """Add a new lead to database, returns lead_id"""
+    with db_cursor() as cursor:
+        cursor.execute("""
+            INSERT OR IGNORE INTO leads (username, bio, last_post_topic, niche)
+            VALUES (?, ?, ?, ?)
+        """, (username, bio, last_post_topic, niche))
+        if cursor.rowcount == 0:
+            # If insert ignored, lead already exists, fetch its ID
+            cursor.execute("SELECT id FROM leads WHERE username = ?", (username,))
+            lead_id = cursor.fetchone()[0]
         else:
-            cursor.execute(f"""
-                INSERT OR IGNORE INTO conversations (lead_id, state)
-                VALUES ({p}, 'new')
-            """, (lead_id,))
-            
-        conn.commit()
+            lead_id = cursor.lastrowid
+        
+        # Create or Get conversation for this lead
+        cursor.execute("""
+            INSERT OR IGNORE INTO conversations (lead_id, state)
+            VALUES (?, 'new')
+        """, (lead_id,))
+        
         return lead_id
-    finally:
-        conn.close()
+
+
+add_lead = _add_lead_pg if IS_PG else _add_lead_sqlite
+
+
+def _add_leads_bulk_pg(rows: list) -> int:
+    """
+    Add many leads in one transaction.
+    rows: (username, bio, last_post_topic, niche) tuples. Returns number of new leads.
+    """
+    if not rows:
+        return 0
+    
+    with db_cursor() as cursor:
+        new_ids = execute_values(cursor, """
+            INSERT INTO leads (username, bio, last_post_topic, niche)
+            VALUES %s
+            ON CONFLICT (username) DO NOTHING
+            RETURNING id
+        """, rows, fetch=True)
+        cursor.execute("""
+            INSERT INTO conversations (lead_id, state)
+            SELECT id, 'new' FROM leads WHERE username = ANY(%s)
+            ON CONFLICT (lead_id) DO NOTHING
+        """, ([row[0] for row in rows],))
+    return len(new_ids)
+
+
+def _add_leads_bulk_sqlite(rows: list) -> int:
+    """
+    Add many leads in one transaction.
+    rows: (username, bio, last_post_topic, niche) tuples. Returns number of new leads.
+    """
+    if not rows:
+        return 0
+    
+    with db_cursor() as cursor:
+        cursor.executemany("""
+            INSERT OR IGNORE INTO leads (username, bio, last_post_topic, niche)
+            VALUES (?, ?, ?, ?)
+        """, rows)
+        added = cursor.rowcount
+        cursor.executemany("""
+            INSERT OR IGNORE INTO conversations (lead_id, state)
+            SELECT id, 'new' FROM leads WHERE username = ?
+        """, [(row[0],) for row in rows])
+    return added
+
+
+add_leads_bulk = _add_leads_bulk_pg if IS_PG else _add_leads_bulk_sqlite
+
+
+def save_leads_bulk(leads: list) -> int:
+    """Add scraped Lead objects in one transaction, returns number of new leads"""
+    return add_leads_bulk([
+        (lead.username, lead.bio, lead.last_post_topic, lead.niche)
+        for lead in leads
+    ])
+
+
+_SQL_GET_LEAD = f"SELECT * FROM leads WHERE username = {PH}"
 
 
 def get_lead_by_username(username: str) -> Optional[dict]:
     """Get lead by username"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"SELECT * FROM leads WHERE username = {p}", (username,))
-    row = cursor.fetchone()
-    conn.close()
-    return dict(row) if row else None
+    with db_cursor(readonly=True) as cursor:
+        _run(cursor, "get_lead_by_username", (username,))
+        row = _fetchone(cursor)
+    return row
+
+
+def get_leads_by_status(status: str, limit: Optional[int] = None, offset: int = 0) -> list:
+    """Get leads with given status (optionally paged with LIMIT/OFFSET)"""
+    with db_cursor(readonly=True) as cursor:
+        if limit is None:
+            cursor.execute(f"SELECT * FROM leads WHERE status = {PH}", (status,))
+        else:
+            cursor.execute(f"SELECT * FROM leads WHERE status = {PH} ORDER BY id LIMIT {PH} OFFSET {PH}", (status, limit, offset))
+        return _fetchall(cursor)
 
 
-def get_leads_by_status(status: str) -> list:
-    """Get all leads with given status"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"SELECT * FROM leads WHERE status = {p}", (status,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+_SQL_UPDATE_LEAD_STATUS = f"""
+    UPDATE leads
+    SET status = {PH}
+    WHERE username = {PH}
+"""
 
 
 def update_lead_status(username: str, status: str):
     """Update lead status"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE leads 
-        SET status = {p}, updated_at = CURRENT_TIMESTAMP
-        WHERE username = {p}
-    """, (status, username))
-    conn.commit()
-    conn.close()
+    with db_cursor() as cursor:
+        _run(cursor, "update_lead_status", (status, username))
 
 
 def update_lead_score(username: str, score_delta: int):
     """Update lead confidence score"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE leads 
-        SET confidence_score = confidence_score + {p}, updated_at = CURRENT_TIMESTAMP
-        WHERE username = {p}
-    """, (score_delta, username))
-    conn.commit()
-    conn.close()
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE leads 
+            SET confidence_score = confidence_score + {PH}
+            WHERE username = {PH}
+        """, (score_delta, username))
+
+
+_SQL_INCREMENT_REJECTIONS = f"""
+    UPDATE leads 
+    SET consecutive_rejections = consecutive_rejections + 1
+    WHERE username = {PH}
+"""
+# UPDATE ... RETURNING needs SQLite 3.35+; older builds re-read the value
+_HAS_RETURNING = IS_PG or sqlite3.sqlite_version_info >= (3, 35, 0)
 
 
 def increment_rejections(username: str) -> int:
     """Increment consecutive rejections, returns new count"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE leads 
-        SET consecutive_rejections = consecutive_rejections + 1, updated_at = CURRENT_TIMESTAMP
-        WHERE username = {p}
-    """, (username,))
-    cursor.execute(f"SELECT consecutive_rejections FROM leads WHERE username = {p}", (username,))
-    row = cursor.fetchone()
-    conn.commit()
-    conn.close()
+    with db_cursor() as cursor:
+        if _HAS_RETURNING:
+            cursor.execute(_SQL_INCREMENT_REJECTIONS + " RETURNING consecutive_rejections", (username,))
+        else:
+            cursor.execute(_SQL_INCREMENT_REJECTIONS, (username,))
+            cursor.execute(f"SELECT consecutive_rejections FROM leads WHERE username = {PH}", (username,))
+        row = _fetchone(cursor)
     return row['consecutive_rejections'] if row else 0
 
 
 def reset_rejections(username: str):
     """Reset consecutive rejections to 0"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE leads 
-        SET consecutive_rejections = 0, updated_at = CURRENT_TIMESTAMP
-        WHERE username = {p}
-    """, (username,))
-    conn.commit()
-    conn.close()
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE leads 
+            SET consecutive_rejections = 0
+            WHERE username = {PH}
+        """, (username,))
 
 
 # ============== CONVERSATION OPERATIONS ==============
 
+_SQL_GET_CONVERSATION = f"SELECT * FROM conversations WHERE lead_id = {PH}"
+
+
 def get_conversation(lead_id: int) -> Optional[dict]:
     """Get conversation for a lead"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"SELECT * FROM conversations WHERE lead_id = {p}", (lead_id,))
-    row = cursor.fetchone()
-    conn.close()
-    return dict(row) if row else None
+    with db_cursor(readonly=True) as cursor:
+        _run(cursor, "get_conversation", (lead_id,))
+        row = _fetchone(cursor)
+    return row
+
+
+_SQL_GET_LEAD_STATE = f"""
+    SELECT c.state, l.confidence_score
+    FROM leads l LEFT JOIN conversations c ON c.lead_id = l.id
+    WHERE l.username = {PH}
+"""
+
+
+def get_lead_state(username: str) -> Optional[tuple]:
+    """Get (conversation state, confidence_score) for a lead without loading history"""
+    with db_cursor(readonly=True) as cursor:
+        _run(cursor, "get_lead_state", (username,))
+        row = _fetchone(cursor)
+    return (row['state'], row['confidence_score']) if row else None
 
 
 def update_conversation_state(lead_id: int, state: str):
     """Update conversation state"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE conversations 
-        SET state = {p}, last_message_at = CURRENT_TIMESTAMP
-        WHERE lead_id = {p}
-    """, (state, lead_id))
-    conn.commit()
-    conn.close()
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE conversations 
+            SET state = {PH}, last_message_at = CURRENT_TIMESTAMP
+            WHERE lead_id = {PH}
+        """, (state, lead_id))
 
 
 def increment_message_count(lead_id: int):
     """Increment message count for conversation"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE conversations 
-        SET message_count = message_count + 1, last_message_at = CURRENT_TIMESTAMP
-        WHERE lead_id = {p}
-    """, (lead_id,))
-    conn.commit()
-    conn.close()
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE conversations 
+            SET message_count = message_count + 1, last_message_at = CURRENT_TIMESTAMP
+            WHERE lead_id = {PH}
+        """, (lead_id,))
+
+
+def update_conversation_summary(conversation_id: int, summary: str):
+    """Store the rolling conversation summary used by reply prompts"""
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE conversations 
+            SET summary = {PH}
+            WHERE id = {PH}
+        """, (summary, conversation_id))
 
 
 # ============== MESSAGE OPERATIONS ==============
 
+_SQL_ADD_MESSAGE = f"""
+    INSERT INTO messages (conversation_id, role, content)
+    VALUES ({PH}, {PH}, {PH})
+"""
+
+
 def add_message(conversation_id: int, role: str, content: str):
     """Add a message to conversation history"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        INSERT INTO messages (conversation_id, role, content)
-        VALUES ({p}, {p}, {p})
-    """, (conversation_id, role, content))
-    conn.commit()
-    conn.close()
-
-
-def get_conversation_history(conversation_id: int) -> list:
-    """Get all messages in a conversation"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        SELECT role, content, created_at 
-        FROM messages 
-        WHERE conversation_id = {p}
-        ORDER BY created_at ASC
-    """, (conversation_id,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    with db_cursor() as cursor:
+        _run(cursor, "add_message", (conversation_id, role, content))
+
+
+_SQL_GET_HISTORY = f"""
+    SELECT role, content, created_at
+    FROM messages
+    WHERE conversation_id = {PH}
+    ORDER BY created_at ASC
+"""
+
+
+# Rows fetched per round trip when streaming history from a PG server-side cursor
+HISTORY_FETCH_SIZE = 100
+
+
+def get_conversation_history(conversation_id: int, last: Optional[int] = None) -> list:
+    """
+    Messages of a conversation, oldest first (only the newest `last` if given).
+    Rows are streamed into a bounded deque and the cursor is closed before
+    returning, so no server-side cursor or pool slot outlives the call.
+    """
+    rows = deque(maxlen=last)
+    with db_cursor(readonly=True, name=f"hist_{conversation_id}") as cursor:
+        if IS_PG:
+            cursor.itersize = HISTORY_FETCH_SIZE
+        cursor.execute(_SQL_GET_HISTORY, (conversation_id,))
+        rows.extend(_iter_rows(cursor))
+    return list(rows)
+
+
+# ============== FUSED WRITES ==============
+
+def apply_reply_transaction(lead_id: int, conversation_id: int, username: str,
+                            user_message: str, bot_message: Optional[str],
+                            score_delta: int, new_state: Optional[str], reset_rej: bool):
+    """
+    Persist everything one processed inbox reply changes in a single transaction:
+    user message, optional bot reply, score delta, rejection reset and state.
+    """
+    with db_cursor() as cursor:
+        rows = [(conversation_id, 'user', user_message)]
+        if bot_message:
+            rows.append((conversation_id, 'assistant', bot_message))
+        cursor.executemany(f"""
+            INSERT INTO messages (conversation_id, role, content)
+            VALUES ({PH}, {PH}, {PH})
+        """, rows)
+        
+        reset_sql = ", consecutive_rejections = 0" if reset_rej else ""
+        cursor.execute(f"""
+            UPDATE leads 
+            SET confidence_score = confidence_score + {PH}{reset_sql}
+            WHERE username = {PH}
+        """, (score_delta, username))
+        
+        if new_state or bot_message:
+            state_sql = f"state = {PH}, " if new_state else ""
+            params = ((new_state,) if new_state else ()) + (1 if bot_message else 0, lead_id)
+            cursor.execute(f"""
+                UPDATE conversations 
+                SET {state_sql}message_count = message_count + {PH}, last_message_at = CURRENT_TIMESTAMP
+                WHERE lead_id = {PH}
+            """, params)
 
 
 # ============== BOT STATE OPERATIONS ==============
 
 def is_bot_paused() -> bool:
     """Check if bot is in pause state (kill-switch active)"""
-    conn, _ = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute("SELECT paused_until FROM bot_state WHERE id = 1")
-    row = cursor.fetchone()
-    conn.close()
+    with db_cursor(readonly=True) as cursor:
+        cursor.execute("SELECT paused_until FROM bot_state WHERE id = 1")
+        row = _fetchone(cursor)
     
     if row and row['paused_until']:
         try:
@@ -339,78 +812,51 @@ def is_bot_paused() -> bool:
 
 def pause_bot(duration_seconds: int):
     """Pause bot for specified duration (kill-switch)"""
-    paused_until_dt = datetime.fromtimestamp(datetime.now().timestamp() + duration_seconds)
+    paused_until_dt = datetime.now() + timedelta(seconds=duration_seconds)
     
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE bot_state 
-        SET paused_until = {p}, updated_at = CURRENT_TIMESTAMP
-        WHERE id = 1
-    """, (paused_until_dt,))
-    conn.commit()
-    conn.close()
-    print(f"⚠️ Bot paused until {paused_until_dt}")
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE bot_state 
+            SET paused_until = {PH}
+            WHERE id = 1
+        """, (paused_until_dt,))
+    log.warning(f"⚠️ Bot paused until {paused_until_dt}")
+
+
+_SQL_GET_DM_COUNT_TODAY = f"""
+    SELECT CASE WHEN last_dm_date = {PH} THEN total_dms_today ELSE 0 END AS cnt
+    FROM bot_state WHERE id = 1
+"""
 
 
 def get_dm_count_today() -> int:
     """Get number of DMs sent today"""
-    conn, _ = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute("""
-        SELECT total_dms_today, last_dm_date 
-        FROM bot_state WHERE id = 1
-    """)
-    row = cursor.fetchone()
-    conn.close()
-    
-    if row:
-        last_date = row['last_dm_date']
-        # Convert date object to string if needed
-        if not isinstance(last_date, str):
-            last_date = last_date.strftime('%Y-%m-%d')
-            
-        today = datetime.now().strftime('%Y-%m-%d')
-        if last_date == today:
-            return row['total_dms_today']
-    return 0
+    with db_cursor(readonly=True) as cursor:
+        cursor.execute(_SQL_GET_DM_COUNT_TODAY, (_today(),))
+        row = _fetchone(cursor)
+    return row['cnt'] if row else 0
+
+
+_SQL_INCREMENT_DM_COUNT = f"""
+    UPDATE bot_state 
+    SET total_dms_today = CASE WHEN last_dm_date = {PH} THEN total_dms_today + 1 ELSE 1 END,
+        last_dm_date = {PH}
+    WHERE id = 1
+"""
 
 
 def increment_dm_count():
-    """Increment DM count for today"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    is_pg = not isinstance(conn, sqlite3.Connection)
-    
-    # Check if it's a new day
-    cursor.execute("SELECT last_dm_date FROM bot_state WHERE id = 1")
-    row = cursor.fetchone()
-    
-    last_date = row['last_dm_date']
-    if not isinstance(last_date, str):
-        last_date = last_date.strftime('%Y-%m-%d')
-
-    if row and last_date != today:
-        # Reset count for new day
-        if is_pg:
-            cursor.execute(f"UPDATE bot_state SET total_dms_today = 1, last_dm_date = CURRENT_DATE, updated_at = CURRENT_TIMESTAMP WHERE id = 1")
-        else:
-            cursor.execute(f"UPDATE bot_state SET total_dms_today = 1, last_dm_date = date('now'), updated_at = CURRENT_TIMESTAMP WHERE id = 1")
-    else:
-        cursor.execute(f"UPDATE bot_state SET total_dms_today = total_dms_today + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1")
-    
-    conn.commit()
-    conn.close()
+    """Increment DM count for today (resets to 1 on a new day)"""
+    with db_cursor() as cursor:
+        today = _today()
+        cursor.execute(_SQL_INCREMENT_DM_COUNT, (today, today))
 
 
 def get_account_age_days() -> int:
     """Get account age in days for rate limiting"""
-    conn, _ = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute("SELECT account_created_date FROM bot_state WHERE id = 1")
-    row = cursor.fetchone()
-    conn.close()
+    with db_cursor(readonly=True) as cursor:
+        cursor.execute("SELECT account_created_date FROM bot_state WHERE id = 1")
+        row = _fetchone(cursor)
     
     if row and row['account_created_date']:
         created = row['account_created_date']
@@ -423,38 +869,133 @@ def get_account_age_days() -> int:
 
 def set_account_created_date(date_str: str):
     """Set the account creation date for warmup calculation"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE bot_state 
-        SET account_created_date = {p}, updated_at = CURRENT_TIMESTAMP
-        WHERE id = 1
-    """, (date_str,))
-    conn.commit()
-    conn.close()
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE bot_state 
+            SET account_created_date = {PH}
+            WHERE id = 1
+        """, (date_str,))
 
 
 def get_stored_session() -> Optional[str]:
     """Get stored Instagram session from database"""
-    conn, _ = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute("SELECT instagram_session FROM bot_state WHERE id = 1")
-    row = cursor.fetchone()
-    conn.close()
+    with db_cursor(readonly=True) as cursor:
+        cursor.execute("SELECT instagram_session FROM bot_state WHERE id = 1")
+        row = _fetchone(cursor)
     return row['instagram_session'] if row else None
 
 
 def save_stored_session(session_data: str):
     """Save Instagram session to database"""
-    conn, p = get_connection()
-    cursor = get_cursor(conn)
-    cursor.execute(f"""
-        UPDATE bot_state 
-        SET instagram_session = {p}, updated_at = CURRENT_TIMESTAMP
-        WHERE id = 1
-    """, (session_data,))
-    conn.commit()
-    conn.close()
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE bot_state 
+            SET instagram_session = {PH}
+            WHERE id = 1
+        """, (session_data,))
+
+
+# ============== SCRAPE RECORD OPERATIONS ==============
+
+_SQL_GET_SCRAPE_RECORD = f"SELECT * FROM scraped_usernames WHERE username = {PH}"
+
+
+def get_scrape_record(username: str) -> Optional[dict]:
+    """Get discovery scrape record for a username"""
+    with db_cursor(readonly=True) as cursor:
+        _run(cursor, "get_scrape_record", (username,))
+        row = _fetchone(cursor)
+    return row
+
+
+_SQL_UPSERT_SCRAPE_RECORD = f"""
+    INSERT INTO scraped_usernames (username, scraped_at, was_business, niche)
+    VALUES ({PH}, {PH}, {PH}, {PH})
+    ON CONFLICT (username) DO UPDATE SET
+    scraped_at = excluded.scraped_at,
+    was_business = excluded.was_business,
+    niche = excluded.niche
+"""
+
+
+def upsert_scrape_record(username: str, scraped_at: int, was_business: bool, niche: Optional[str] = None):
+    """Insert or refresh the discovery scrape record for a username"""
+    with db_cursor() as cursor:
+        cursor.execute(_SQL_UPSERT_SCRAPE_RECORD, (username, scraped_at, int(was_business), niche))
+
+
+# ============== NICHE CACHE OPERATIONS ==============
+
+_SQL_GET_CACHED_NICHE = f"SELECT niche FROM niche_cache WHERE hash = {PH} AND ts >= {PH}"
+
+
+def get_cached_niche(key: str, min_ts: int) -> Optional[str]:
+    """Get cached niche for a content hash if it is newer than min_ts"""
+    with db_cursor(readonly=True) as cursor:
+        _run(cursor, "get_cached_niche", (key, min_ts))
+        row = _fetchone(cursor)
+    return row['niche'] if row else None
+
+
+_SQL_SAVE_CACHED_NICHE = f"""
+    INSERT INTO niche_cache (hash, niche, ts)
+    VALUES ({PH}, {PH}, {PH})
+    ON CONFLICT (hash) DO UPDATE SET niche = excluded.niche, ts = excluded.ts
+"""
+
+
+def save_cached_niche(key: str, niche: str, ts: int):
+    """Insert or refresh a niche cache entry"""
+    with db_cursor() as cursor:
+        cursor.execute(_SQL_SAVE_CACHED_NICHE, (key, niche, ts))
+
+
+def clear_niche_cache() -> int:
+    """Delete all niche cache entries, returns number of rows removed"""
+    with db_cursor() as cursor:
+        cursor.execute("DELETE FROM niche_cache")
+        deleted = cursor.rowcount
+    return deleted
+
+
+# ============== FOLLOWER CURSOR OPERATIONS ==============
+
+def get_follower_cursor(source_user: str) -> str:
+    """Saved followers max_id for a source account ("" = start from page 1)"""
+    with db_cursor(readonly=True) as cursor:
+        cursor.execute(f"SELECT cursor FROM follower_cursors WHERE source_user = {PH}", (source_user,))
+        row = _fetchone(cursor)
+    return row['cursor'] if row else ""
+
+
+def save_follower_cursor(source_user: str, next_cursor: str):
+    """Store the next followers max_id; an empty cursor (list exhausted) clears it"""
+    with db_cursor() as cursor:
+        if not next_cursor:
+            cursor.execute(f"DELETE FROM follower_cursors WHERE source_user = {PH}", (source_user,))
+            return
+        cursor.execute(f"""
+            INSERT INTO follower_cursors (source_user, cursor)
+            VALUES ({PH}, {PH})
+            ON CONFLICT (source_user) DO UPDATE SET cursor = excluded.cursor
+        """, (source_user, next_cursor))
+
+
+# ============== PREPARED STATEMENTS ==============
+# Hot statements by name: plain SQL (SQLite / unprepared PG) and the PG EXECUTE form
+_HOT_SQL = {
+    "get_lead_by_username": _SQL_GET_LEAD,
+    "get_conversation": _SQL_GET_CONVERSATION,
+    "get_lead_state": _SQL_GET_LEAD_STATE,
+    "update_lead_status": _SQL_UPDATE_LEAD_STATUS,
+    "add_message": _SQL_ADD_MESSAGE,
+    "get_scrape_record": _SQL_GET_SCRAPE_RECORD,
+    "get_cached_niche": _SQL_GET_CACHED_NICHE,
+}
+_PG_EXECUTE = {
+    name: f"EXECUTE {name}(" + ", ".join(["%s"] * sql.count("%s")) + ")"
+    for name, sql in _HOT_SQL.items()
+}
 
 
 # Initialize on import
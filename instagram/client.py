@@ -2,42 +2,154 @@
 Instagram API Client
 Session-first login, DM sending with human delay, inbox monitoring
 """
-import json
+import logging
 import time
+import functools
 import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from collections import OrderedDict
 from typing import Optional, List
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from instagrapi import Client
 from instagrapi.exceptions import LoginRequired, ChallengeRequired
 
+from instagram import session_json
+
 from config import (
     INSTAGRAM_USERNAME, 
     INSTAGRAM_PASSWORD,
     SESSION_FILE,
     TYPING_SPEED,
     DELAY_MIN,
-    DELAY_MAX
+    DELAY_MAX,
+    SEND_GAP_MIN,
+    SEND_GAP_MAX,
+    SUGGESTIONS_CACHE_TTL,
+    SEARCH_CACHE_TTL,
+    SESSION_PROBE_TTL
 )
 
+log = logging.getLogger("instabot")
+
+
+def _search_cached(fn):
+    """Serve repeated (query, amount) searches from self._search_cache; empty results aren't cached"""
+    @functools.wraps(fn)
+    def wrapper(self, query: str, amount: int = 20) -> List[str]:
+        key = (fn.__name__, query, amount)
+        with self._cache_lock:
+            cached = self._search_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        result = fn(self, query, amount)
+        if result:
+            with self._cache_lock:
+                # Own copy: the caller may mutate the list it gets back
+                self._search_cache[key] = list(result)
+        return result
+    return wrapper
+
+
+class NotReadyError(Exception):
+    """Raised by send_dm when the anti-ban gap since the last DM has not elapsed"""
+
 
 class InstagramClient:
     """Instagram API wrapper with session management and human simulation"""
     
+    # Resolved username -> user_id entries kept (LRU)
+    UID_CACHE_SIZE = 1024
+    
     def __init__(self):
         self.client = Client()
+        self._configure_http_pool()
         self.logged_in = False
+        # instagrapi's Client is not thread-safe; every API call goes through _api
+        self._lock = threading.Lock()
+        self._login_lock = threading.Lock()
+        # time.monotonic() of the last successful API call (session known alive)
+        self._last_ok_ts = 0.0
+        # Suggestions change slowly; the same seed shows up across discovery passes
+        self._suggestions_cache = TTLCache(maxsize=512, ttl=SUGGESTIONS_CACHE_TTL)
+        # Discovery sweeps repeat seeds and hashtags within a batch
+        self._search_cache = TTLCache(maxsize=256, ttl=SEARCH_CACHE_TTL)
+        self._cache_lock = threading.Lock()
+        # user_id_from_username is a full HTTP round trip; ids never change
+        self._uid_cache: OrderedDict = OrderedDict()
+        # Follower cursors fetched but not yet committed (username -> next max_id)
+        self._pending_follower_cursors = {}
+        # Earliest time.monotonic() at which the next DM may go out
+        self._next_send_at = 0.0
+        self._send_lock = threading.Lock()
+        # The send slot admits one DM at a time; its typing delay + send run
+        # on this worker so no caller blocks on the sleep
+        self._sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dm-sender")
+    
+    def _configure_http_pool(self):
+        """Reuse TCP+TLS connections to Instagram instead of reconnecting per call"""
+        session = self.client.private
+        session.headers["Connection"] = "keep-alive"
         
+        # Newer instagrapi ships its own pooled HTTP/2 (curl) adapter; keep it
+        if getattr(self.client, "private_transport", "requests") != "requests":
+            return
+        
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+            ),
+        )
+        session.mount("https://i.instagram.com", adapter)
+        session.mount("https://www.instagram.com", adapter)
+    
+    def _api(self, fn, *args, **kwargs):
+        """Call an instagrapi method while holding the client lock"""
+        with self._lock:
+            try:
+                result = fn(*args, **kwargs)
+            except LoginRequired:
+                self.logged_in = False
+                raise
+            self._last_ok_ts = time.monotonic()
+            return result
+        
+    def _uid(self, username: str):
+        """user_id for a username, resolved once per session (LRU cached)"""
+        with self._cache_lock:
+            user_id = self._uid_cache.get(username)
+            if user_id is not None:
+                self._uid_cache.move_to_end(username)
+                return user_id
+        
+        user_id = self._api(self.client.user_id_from_username, username)
+        with self._cache_lock:
+            self._uid_cache[username] = user_id
+            if len(self._uid_cache) > self.UID_CACHE_SIZE:
+                self._uid_cache.popitem(last=False)
+        return user_id
+    
     def ensure_logged_in(self) -> bool:
         """Ensure session is valid, login if not"""
         if self.logged_in:
+            if time.monotonic() - self._last_ok_ts < SESSION_PROBE_TTL:
+                return True
             try:
                 # Quick check if session is still alive
-                self.client.user_id_from_username("instagram")
+                self._api(self.client.user_id_from_username, "instagram")
                 return True
             except:
                 self.logged_in = False
         
-        print("🔄 Session expired or missing. Re-logging in...")
+        log.info("🔄 Session expired or missing. Re-logging in...")
         return self.login()
 
     def login(self) -> bool:
@@ -45,54 +157,58 @@ class InstagramClient:
         Session-first login strategy.
         Checks Database, then File, finally Password.
         """
+        with self._login_lock:
+            # Another thread may have logged in while we waited for the lock
+            if self.logged_in:
+                return True
+            return self._login()
+    
+    def _login(self) -> bool:
+        """Login implementation (caller holds _login_lock)"""
         from database.models import get_stored_session, save_stored_session
+        from config import DATABASE_URL
         
-        from database.models import get_stored_session, save_stored_session, get_connection
-        import sqlite3
-        
-        # Check connection type for logging
-        conn, _ = get_connection()
-        is_pg = not isinstance(conn, sqlite3.Connection)
-        db_type = "PostgreSQL (Neon)" if is_pg else "SQLite (Local)"
-        conn.close()
+        # Connection type for logging
+        db_type = "PostgreSQL (Neon)" if DATABASE_URL else "SQLite (Local)"
         
         # 1. Try Loading from Database (Highest priority for Cloud Sync)
-        print(f"📡 Checking {db_type} for session...")
+        log.info(f"📡 Checking {db_type} for session...")
         db_session = get_stored_session()
         if db_session:
-            print(f"📦 Found session in {db_type}, attempting to load...")
+            log.info(f"📦 Found session in {db_type}, attempting to load...")
             try:
-                session_data = json.loads(db_session)
-                self.client.set_settings(session_data)
+                session_data = session_json.loads(db_session)
+                with self._lock:
+                    self.client.set_settings(session_data)
                 self.logged_in = True
-                print(f"✅ Database session valid for ID: {self.client.user_id}")
+                log.info(f"✅ Database session valid for ID: {self.client.user_id}")
                 return True
             except Exception as e:
-                print(f"⚠️ Database session invalid: {e}")
+                log.warning(f"⚠️ Database session invalid: {e}")
         else:
-            print(f"ℹ️ No session found in {db_type} storage")
+            log.info(f"ℹ️ No session found in {db_type} storage")
 
         # 2. Try loading from Local File
         if self._load_session():
-            print("✅ Loaded existing session from file")
+            log.info("✅ Loaded existing session from file")
             self._save_session() # Sync to DB immediately
             self.logged_in = True
             return True
         
         # 3. Fall back to password login
-        print("🔑 Logging in with password...")
+        log.info("🔑 Logging in with password...")
         try:
-            self.client.login(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
+            self._api(self.client.login, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
             self._save_session()
-            print("✅ Login successful, session synced")
+            log.info("✅ Login successful, session synced")
             self.logged_in = True
             return True
         except ChallengeRequired as e:
-            print(f"❌ Challenge required: {e}")
-            print("Please complete the challenge manually and try again")
+            log.error(f"❌ Challenge required: {e}")
+            log.info("Please complete the challenge manually and try again")
             return False
         except Exception as e:
-            print(f"❌ Login failed: {e}")
+            log.error(f"❌ Login failed: {e}")
             return False
     
     def _load_session(self) -> bool:
@@ -101,7 +217,8 @@ class InstagramClient:
             return False
         
         try:
-            self.client.load_settings(SESSION_FILE)
+            with self._lock:
+                self.client.load_settings(SESSION_FILE)
             if self.client.user_id:
                 return True
         except:
@@ -111,224 +228,310 @@ class InstagramClient:
     def _save_session(self):
         """Save session to file AND database"""
         from database.models import save_stored_session
+        # Serialize once; the file and the database get the same blob
+        with self._lock:
+            settings = self.client.get_settings()
+        blob = session_json.dumps(settings)
+        
         # Save to file
         try:
-            self.client.dump_settings(SESSION_FILE)
+            SESSION_FILE.write_text(blob)
         except Exception as e:
-            print(f"⚠️ Could not save session to file: {e}")
+            log.warning(f"⚠️ Could not save session to file: {e}")
             
         # Save to database (JSON string)
         try:
-            session_data = self.client.get_settings()
-            save_stored_session(json.dumps(session_data))
+            save_stored_session(blob)
         except Exception as e:
-            print(f"⚠️ Could not sync session to database: {e}")
+            log.warning(f"⚠️ Could not sync session to database: {e}")
+    
+    def get_user_id(self, username: str):
+        """user_id for a username (cached); raises on lookup failure"""
+        return self._uid(username)
+    
+    def get_user_info_by_id(self, user_id) -> dict:
+        """Profile info for an already-resolved user_id (v1 Mobile API); raises on failure"""
+        info = self._api(self.client.user_info_v1, user_id) # Using v1
+        return {
+            'user_id': user_id,
+            'username': info.username,
+            'full_name': info.full_name,
+            'bio': info.biography,
+            'followers': info.follower_count,
+            'following': info.following_count,
+            'posts_count': info.media_count,
+            'is_business': info.is_business,
+            'category': info.category if hasattr(info, 'category') else None
+        }
+    
+    def get_user_recent_posts_by_id(self, user_id, count: int = 3) -> List[dict]:
+        """Recent post captions for an already-resolved user_id (v1 Mobile API); raises on failure"""
+        medias = self._api(self.client.user_medias_v1, user_id, count) # Using v1
+        return [
+            {
+                'caption': media.caption_text if media.caption_text else "",
+                'likes': media.like_count,
+                'comments': media.comment_count,
+                'timestamp': media.taken_at
+            }
+            for media in medias
+        ]
     
     def get_user_info(self, username: str) -> Optional[dict]:
         """Get user profile info using v1 (Mobile API) for stability"""
         try:
-            user_id = self.client.user_id_from_username(username)
-            info = self.client.user_info_v1(user_id) # Using v1
-            return {
-                'user_id': user_id,
-                'username': info.username,
-                'full_name': info.full_name,
-                'bio': info.biography,
-                'followers': info.follower_count,
-                'following': info.following_count,
-                'posts_count': info.media_count,
-                'is_business': info.is_business,
-                'category': info.category if hasattr(info, 'category') else None
-            }
+            return self.get_user_info_by_id(self._uid(username))
         except Exception as e:
-            print(f"❌ Failed to get user info for {username}: {e}")
+            log.error(f"❌ Failed to get user info for {username}: {e}")
             return None
     
     def get_user_recent_posts(self, username: str, count: int = 3) -> List[dict]:
         """Get user's recent post captions using v1 (Mobile API)"""
         try:
-            user_id = self.client.user_id_from_username(username)
-            medias = self.client.user_medias_v1(user_id, count) # Using v1
-            return [
-                {
-                    'caption': media.caption_text if media.caption_text else "",
-                    'likes': media.like_count,
-                    'comments': media.comment_count,
-                    'timestamp': media.taken_at
-                }
-                for media in medias
-            ]
+            return self.get_user_recent_posts_by_id(self._uid(username), count)
         except Exception as e:
-            print(f"❌ Failed to get posts for {username}: {e}")
+            log.error(f"❌ Failed to get posts for {username}: {e}")
             return []
     
     def get_user_followers(self, username: str, amount: int = 50) -> List[str]:
         """Get followers of a specific user with multiple fallback methods (prioritize v1)"""
+        from database.models import get_follower_cursor
         try:
-            user_id = self.client.user_id_from_username(username)
-            followers = []
+            user_id = self._uid(username)
+            followers = None  # None = v1 failed; [] = account has no followers
             
-            # Method 1: v1 (Most stable for authenticated sessions)
+            # Method 1: v1 (Most stable for authenticated sessions), resuming where
+            # the previous committed scrape of this account stopped
             try:
-                print(f"📡 Method 1: user_followers_v1...")
-                f_list = self.client.user_followers_v1(user_id, amount=amount)
-                followers = [f.username for f in f_list]
+                log.info(f"📡 Method 1: user_followers_v1...")
+                start = get_follower_cursor(username)
+                f_list, next_cursor = self._api(
+                    self.client.user_followers_v1_chunk, user_id, max_amount=amount, max_id=start
+                )
+                # Saved only by commit_follower_cursor, once these followers are processed
+                with self._cache_lock:
+                    self._pending_follower_cursors[username] = next_cursor
+                followers = []
+                followers.extend(f.username for f in f_list)
             except Exception as e:
-                print(f"⚠️ Method 1 (v1) failed: {e}")
+                log.warning(f"⚠️ Method 1 (v1) failed: {e}")
             
             # Method 2: Fallback to standard if v1 failed
-            if not followers:
+            if followers is None:
+                followers = []
                 try:
-                    print(f"📡 Method 2: user_followers (standard)...")
-                    f_dict = self.client.user_followers(user_id, amount=amount)
-                    followers = [f.username for f in f_dict.values()]
+                    log.info(f"📡 Method 2: user_followers (standard)...")
+                    f_dict = self._api(self.client.user_followers, user_id, amount=amount)
+                    followers.extend(f.username for f in f_dict.values())
                 except Exception as e:
-                    print(f"⚠️ Method 2 failed: {e}")
+                    log.warning(f"⚠️ Method 2 failed: {e}")
             
             return followers
         except Exception as e:
-            print(f"❌ Failed to resolve user_id for {username}: {e}")
+            log.error(f"❌ Failed to resolve user_id for {username}: {e}")
             return []
 
+    def commit_follower_cursor(self, username: str):
+        """Persist the cursor past the last get_user_followers chunk (call after processing it)"""
+        from database.models import save_follower_cursor
+        with self._cache_lock:
+            if username not in self._pending_follower_cursors:
+                return
+            next_cursor = self._pending_follower_cursors.pop(username)
+        save_follower_cursor(username, next_cursor)
+
     def get_post_likers(self, username: str, amount: int = 50) -> List[str]:
         """Get usernames of users who liked the most recent post (using v1 fallback)"""
         try:
-            user_id = self.client.user_id_from_username(username)
+            user_id = self._uid(username)
             # Try getting media using v1
-            medias = self.client.user_medias_v1(user_id, amount=1)
+            medias = self._api(self.client.user_medias_v1, user_id, amount=1)
             if not medias:
                 return []
             
             media_id = medias[0].id
             # media_likers uses a stable endpoint
-            likers = self.client.media_likers(media_id)
+            likers = self._api(self.client.media_likers, media_id)
             return [user.username for user in likers[:amount]]
         except Exception as e:
-            print(f"❌ Failed to get post likers for {username}: {e}")
+            log.error(f"❌ Failed to get post likers for {username}: {e}")
             return []
 
+    @_search_cached
     def search_users_by_query(self, query: str, amount: int = 20) -> List[str]:
         """Search profiles by keyword using v1 for stability"""
         self.ensure_logged_in()
         try:
-            print(f"🔎 Searching for keyword: {query}")
+            log.info(f"🔎 Searching for keyword: {query}")
             # search_users_v1 requires 'count'
-            users = self.client.search_users_v1(query, count=amount)
+            users = self._api(self.client.search_users_v1, query, count=amount)
             return [user.username for user in users]
         except Exception as e:
-            print(f"❌ Keyword search failed for '{query}': {e}")
+            log.error(f"❌ Keyword search failed for '{query}': {e}")
             return []
 
+    @_search_cached
     def get_location_feed(self, location_name: str, amount: int = 20) -> List[str]:
         """Get usernames from a specific location using v1 for media"""
         self.ensure_logged_in()
         try:
-            print(f"📍 Searching for location: {location_name}")
+            log.info(f"📍 Searching for location: {location_name}")
             # fbsearch_places is the correct method name
-            locations = self.client.fbsearch_places(location_name)
+            locations = self._api(self.client.fbsearch_places, location_name)
             if not locations:
                 return []
             
             # Use the first location match
             location = locations[0]
             # Use v1 for media fetching for better stability
-            medias = self.client.location_medias_v1(location.pk, amount=amount)
+            medias = self._api(self.client.location_medias_v1, location.pk, amount=amount)
             return [media.user.username for media in medias]
         except Exception as e:
-            print(f"❌ Location search failed for '{location_name}': {e}")
+            log.error(f"❌ Location search failed for '{location_name}': {e}")
             return []
 
+    @_search_cached
     def get_hashtag_feed(self, hashtag: str, amount: int = 20) -> List[str]:
         """Get usernames from a specific hashtag using v1"""
         self.ensure_logged_in()
         try:
             # Remove # if present
             tag = hashtag.replace("#", "")
-            print(f"🏷️ Searching for hashtag: #{tag}")
-            medias = self.client.hashtag_medias_v1(tag, amount=amount)
+            log.info(f"🏷️ Searching for hashtag: #{tag}")
+            medias = self._api(self.client.hashtag_medias_v1, tag, amount=amount)
             return [media.user.username for media in medias]
         except Exception as e:
-            print(f"❌ Hashtag search failed for '#{hashtag}': {e}")
+            log.error(f"❌ Hashtag search failed for '#{hashtag}': {e}")
             return []
 
     def top_search_leads(self, query: str) -> List[str]:
         """Search using the top/search endpoint (v1)"""
         self.ensure_logged_in()
         try:
-            print(f"🔦 Top Search for: {query}")
-            results = self.client.top_search(query)
-            usernames = []
+            log.info(f"🔦 Top Search for: {query}")
+            results = self._api(self.client.top_search, query)
+            # Users and hashtag media owners overlap; dedupe before profiles are scraped
+            seen = set()
             
             # Extract from users
             if 'users' in results:
                 for u in results['users']:
-                    usernames.append(u['user']['username'])
+                    seen.add(u['user']['username'])
             
             # Extract from hashtags (take recent media owners)
             if 'hashtags' in results:
                 for h in results['hashtags'][:2]:
-                    usernames.extend(self.get_hashtag_feed(h['hashtag']['name'], amount=5))
+                    seen.update(self.get_hashtag_feed(h['hashtag']['name'], amount=5))
             
-            return usernames
+            return list(seen)
         except Exception as e:
-            print(f"❌ Top search failed for '{query}': {e}")
+            log.error(f"❌ Top search failed for '{query}': {e}")
             return []
 
     def get_suggested_users(self, username: str, amount: int = 15) -> List[str]:
-        """Get similar account recommendations using v1 search_related_profiles"""
+        """Get similar account recommendations using v1 search_related_profiles (TTL-cached)"""
+        with self._cache_lock:
+            cached = self._suggestions_cache.get(username)
+        if cached is not None:
+            log.info(f"🔗 Using cached suggestions for: {username}")
+            return cached[:amount]
+        
         try:
-            print(f"🔗 Getting suggestions for: {username}")
-            user_id = self.client.user_id_from_username(username)
+            log.info(f"🔗 Getting suggestions for: {username}")
+            user_id = self._uid(username)
             # instagrapi usually handles this via v1 automatically if using v1 methods
-            suggestions = self.client.search_related_profiles(user_id)
-            return [user.username for user in suggestions[:amount]]
+            suggestions = self._api(self.client.search_related_profiles, user_id)
+            usernames = [user.username for user in suggestions]
+            if usernames:
+                with self._cache_lock:
+                    self._suggestions_cache[username] = usernames
+            return usernames[:amount]
         except Exception as e:
-            print(f"❌ Suggestions failed for {username}: {e}")
+            log.error(f"❌ Suggestions failed for {username}: {e}")
             return []
 
-    def send_dm(self, username: str, message: str) -> bool:
+    def seconds_until_ready(self) -> float:
+        """Seconds until send_dm will accept the next DM (0 if ready now)"""
+        return max(0.0, self._next_send_at - time.monotonic())
+    
+    def send_dm(self, username: str, message: str) -> Future:
         """
-        Send DM with human typing delay simulation.
+        Send DM with human typing delay simulation on the sender worker.
         Delay formula: len(message) * TYPING_SPEED + random(DELAY_MIN, DELAY_MAX)
+        Returns a Future[bool]. Raises NotReadyError instead of waiting if the gap
+        between DMs (random SEND_GAP_MIN..SEND_GAP_MAX after each DM attempt) has not elapsed.
         """
         if not self.logged_in:
-            print("❌ Not logged in")
-            return False
+            log.error("❌ Not logged in")
+            future = Future()
+            future.set_result(False)
+            return future
         
+        with self._send_lock:
+            wait = self._next_send_at - time.monotonic()
+            if wait > 0:
+                raise NotReadyError(f"Next DM allowed in {wait:.0f}s")
+            # Reserve the slot so other callers back off while this DM is in flight
+            self._next_send_at = float('inf')
+        
+        try:
+            return self._sender.submit(self._send_in_slot, username, message)
+        except Exception:
+            # Nothing was queued (e.g. sender shut down), so free the slot again
+            self._next_send_at = 0.0
+            raise
+    
+    def _send_in_slot(self, username: str, message: str) -> bool:
+        """Typing delay + send, then open the slot again after the anti-ban gap"""
+        try:
+            return self._send_dm_now(username, message)
+        finally:
+            # Failed sends still hit Instagram, so they get the same gap
+            self._next_send_at = time.monotonic() + random.uniform(SEND_GAP_MIN, SEND_GAP_MAX)
+    
+    def _send_dm_now(self, username: str, message: str) -> bool:
+        """Typing delay + direct_send (caller holds the send slot)"""
+
         # Calculate human-like delay
         typing_time = len(message) * TYPING_SPEED
         random_delay = random.uniform(DELAY_MIN, DELAY_MAX)
         total_delay = typing_time + random_delay
         
-        print(f"⏳ Simulating typing delay: {total_delay:.1f}s")
+        log.info(f"⏳ Simulating typing delay: {total_delay:.1f}s")
         time.sleep(total_delay)
         
         try:
-            user_id = self.client.user_id_from_username(username)
-            self.client.direct_send(message, [user_id])
-            print(f"✅ DM sent to {username}")
+            user_id = self._uid(username)
+            self._api(self.client.direct_send, message, [user_id])
+            log.info(f"✅ DM sent to {username}")
             return True
         except Exception as e:
-            print(f"❌ Failed to send DM to {username}: {e}")
+            log.error(f"❌ Failed to send DM to {username}: {e}")
             return False
     
     def get_unread_messages(self) -> List[dict]:
         """Get unread direct messages"""
         try:
-            threads = self.client.direct_threads(amount=20)
+            # Only the newest message per thread is inspected; don't fetch/parse the rest
+            try:
+                threads = self._api(self.client.direct_threads, amount=20, thread_message_limit=1)
+            except TypeError:
+                # Older instagrapi without thread_message_limit
+                threads = self._api(self.client.direct_threads, amount=20)
             unread = []
+            my_id = str(self.client.user_id)
             
             for thread in threads:
                 # Log all threads for debugging
                 thread_user = thread.users[0].username if thread.users else 'unknown'
-                # print(f"🔍 Found thread with: {thread_user}") # Verbose
+                # log.debug(f"🔍 Found thread with: {thread_user}") # Verbose
                 
                 # Check for unread messages or last message not from us
                 if thread.messages:
                     last_msg = thread.messages[0]
                     # Check if last message is from the other user (not us)
-                    if str(last_msg.user_id) != str(self.client.user_id):
-                        print(f"📩 New message from {thread_user}")
+                    if str(last_msg.user_id) != my_id:
+                        log.info(f"📩 New message from {thread_user}")
                         unread.append({
                                 'thread_id': thread.id,
                                 'username': thread_user,
@@ -338,42 +541,49 @@ class InstagramClient:
             
             return unread
         except Exception as e:
-            print(f"❌ Failed to get messages: {e}")
+            log.error(f"❌ Failed to get messages: {e}")
             return []
     
     def get_thread_messages(self, thread_id: str, count: int = 10) -> List[dict]:
         """Get messages from a specific thread"""
         try:
-            thread = self.client.direct_thread(thread_id)
+            # Ask the server for just `count` messages instead of the default page
+            messages = self._api(self.client.direct_messages, thread_id, amount=count)
+            my_id = str(self.client.user_id)
             return [
                 {
                     'user_id': str(msg.user_id),
                     'text': msg.text if msg.text else "",
                     'timestamp': msg.timestamp,
-                    'is_me': str(msg.user_id) == str(self.client.user_id)
+                    'is_me': str(msg.user_id) == my_id
                 }
-                for msg in thread.messages[:count]
+                for msg in messages[:count]
             ]
         except Exception as e:
-            print(f"❌ Failed to get thread messages: {e}")
+            log.error(f"❌ Failed to get thread messages: {e}")
             return []
     
     def logout(self):
         """Logout and clear session"""
         try:
-            self.client.logout()
+            self._api(self.client.logout)
             self.logged_in = False
-            print("✅ Logged out")
+            with self._cache_lock:
+                self._uid_cache.clear()
+            log.info("✅ Logged out")
         except Exception as e:
-            print(f"⚠️ Logout error: {e}")
+            log.warning(f"⚠️ Logout error: {e}")
 
 
 # Singleton instance
 _client: Optional[InstagramClient] = None
+_client_lock = threading.Lock()
 
 def get_instagram_client() -> InstagramClient:
-    """Get or create Instagram client instance"""
+    """Get or create Instagram client instance (thread-safe)"""
     global _client
     if _client is None:
-        _client = InstagramClient()
+        with _client_lock:
+            if _client is None:
+                _client = InstagramClient()
     return _client
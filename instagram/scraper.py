@@ -2,50 +2,106 @@
 Lead Scraper
 Scrapes Instagram profiles and detects niche using AI
 """
+import logging
+import time
+import random
+from dataclasses import dataclass
 from typing import Optional, List
 from instagram.client import get_instagram_client
-from ai.gemini_client import detect_niche
+from ai.gemini_client import detect_niche_sync
+from config import LEAD_SAVE_BATCH
+from database.models import save_leads_bulk
 
+log = logging.getLogger("instabot")
 
-def scrape_lead(username: str) -> Optional[dict]:
+
+@dataclass(slots=True)
+class Lead:
+    """Scraped profile (slots: discovery runs hold thousands of these)"""
+    username: str
+    bio: str
+    last_post_topic: str
+    niche: Optional[str]
+    followers: int
+    is_business: bool
+
+
+def scrape_lead(username: str, with_niche: bool = True) -> Optional[Lead]:
     """
     Scrape lead information from Instagram profile.
-    Returns dict with bio, last_post_topic, and detected niche.
+    Returns a Lead with bio, last_post_topic, and detected niche.
+    With with_niche=False the niche is left as None (for batch detection).
     """
     client = get_instagram_client()
     
+    # Resolve the user_id once (cached); both fetches below reuse it
+    try:
+        user_id = client.get_user_id(username)
+    except Exception as e:
+        log.error(f"❌ Failed to get user info for {username}: {e}")
+        return None
+    
     # Get user info
-    user_info = client.get_user_info(username)
-    if not user_info:
+    try:
+        user_info = client.get_user_info_by_id(user_id)
+    except Exception as e:
+        log.error(f"❌ Failed to get user info for {username}: {e}")
         return None
     
     # Get recent posts
-    posts = client.get_user_recent_posts(username, count=3)
+    try:
+        posts = client.get_user_recent_posts_by_id(user_id, 3)
+    except Exception as e:
+        log.error(f"❌ Failed to get posts for {username}: {e}")
+        posts = []
+    
     last_post_topic = ""
     if posts and posts[0].get('caption'):
         last_post_topic = posts[0]['caption'][:200]  # First 200 chars
     
     # Detect niche using AI
-    niche = detect_niche(user_info.get('bio', ''), last_post_topic)
+    niche = None
+    if with_niche:
+        niche = detect_niche_sync(user_info.get('bio', ''), last_post_topic)
     
-    return {
-        'username': username,
-        'bio': user_info.get('bio', ''),
-        'last_post_topic': last_post_topic,
-        'niche': niche,
-        'followers': user_info.get('followers', 0),
-        'is_business': user_info.get('is_business', False)
-    }
-
-
-def scrape_leads_from_list(usernames: List[str]) -> List[dict]:
-    """Scrape multiple leads from a list of usernames"""
+    return Lead(
+        username=username,
+        bio=user_info.get('bio', ''),
+        last_post_topic=last_post_topic,
+        niche=niche,
+        followers=user_info.get('followers', 0),
+        is_business=user_info.get('is_business', False)
+    )
+
+
+def scrape_leads_from_list(usernames: List[str]) -> List[Lead]:
+    """Scrape leads one by one (human-paced), saving them every LEAD_SAVE_BATCH"""
     leads = []
-    for username in usernames:
-        print(f"📊 Scraping {username}...")
-        lead = scrape_lead(username)
-        if lead:
-            leads.append(lead)
+    unsaved = []
+    added = 0
+    try:
+        for username in usernames:
+            log.info(f"\n📊 Scraping {username}...")
+            lead = scrape_lead(username)
+            
+            if lead:
+                leads.append(lead)
+                unsaved.append(lead)
+                log.info(f"✅ Scraped lead: {username} ({lead.niche})")
+            else:
+                log.warning(f"⚠️ Failed to scrape {username}")
+            
+            # One transaction per batch instead of a commit per lead
+            if len(unsaved) >= LEAD_SAVE_BATCH:
+                added += save_leads_bulk(unsaved)
+                unsaved = []
+            
+            # Delay between scrapes
+            time.sleep(random.uniform(3, 8))
+    finally:
+        # Keep what was scraped even if the loop was interrupted
+        added += save_leads_bulk(unsaved)
+        log.info(f"✅ Added {added} new leads")
     return leads
 
 
@@ -53,8 +109,7 @@ def load_usernames_from_csv(filepath: str) -> List[str]:
     """Load usernames from a CSV file (one username per line)"""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        return [line.strip() for line in lines if line.strip()]
+            return [name for line in f if (name := line.strip())]
     except Exception as e:
-        print(f"❌ Failed to load CSV: {e}")
+        log.error(f"❌ Failed to load CSV: {e}")
         return []
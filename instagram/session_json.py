@@ -0,0 +1,22 @@
+"""
+Session JSON
+(De)serialization of instagrapi session settings, with orjson when installed
+"""
+import json
+
+try:
+    import orjson  # Optional: faster session (de)serialization
+except ImportError:
+    orjson = None
+
+
+# Session blobs (cookies, device settings) are parsed/dumped on every login and sync
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj) -> str:
+        """Serialize session settings to a JSON string"""
+        return orjson.dumps(obj).decode()
+else:
+    loads = json.loads
+    dumps = json.dumps
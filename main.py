@@ -2,25 +2,58 @@
 Instagram DM Sales Agent Bot
 Main entry point
 """
-import sys
-from datetime import datetime
-
 import sys
 import os
+import atexit
+import logging
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from queue import SimpleQueue
+from logging.handlers import QueueHandler, QueueListener
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from config import validate_config, DATA_DIR
 from database.models import init_database, set_account_created_date
-from bot.scheduler import run_scheduler, add_leads_from_list, scrape_followers_of_user, discover_new_leads, discover_all_uzbek_businesses
+from ai.niche_cache import clear as clear_niche_cache
+# bot.scheduler (instagrapi + Gemini) is imported inside the commands that need it
+
+log = logging.getLogger("instabot")
+
+
+def setup_logging():
+    """Route the "instabot" logger through a queue; stdout writes happen on a listener thread"""
+    queue = SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(queue, console)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    logger = logging.getLogger("instabot")
+    # Replaces the direct stdout handler config.py installs for other entry points
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.addHandler(QueueHandler(queue))
+    logger.propagate = False
+
+
+# Whole ping response built once; every request gets the same bytes
+_PING_BODY = b"Bot is alive!"
+_PING_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/html\r\n"
+    b"Content-Length: " + str(len(_PING_BODY)).encode() + b"\r\n"
+    b"Connection: keep-alive\r\n"
+    b"\r\n" + _PING_BODY
+)
 
 
 class PingHandler(BaseHTTPRequestHandler):
     """Simple handler for keep-alive pings"""
+    protocol_version = "HTTP/1.1"
+    timeout = 60  # Drop idle keep-alive connections
+    
     def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.end_headers()
-        self.wfile.write(b"Bot is alive!")
+        self.wfile.write(_PING_RESPONSE)
 
     def log_message(self, format, *args):
         # Silent logs for pings
@@ -28,14 +61,14 @@ class PingHandler(BaseHTTPRequestHandler):
 
 def start_keep_alive_server(port=8080):
     """Run a simple HTTP server in the background for UptimeRobot"""
-    server = HTTPServer(('0.0.0.0', port), PingHandler)
-    print(f"🌐 Keep-alive server started on port {port}")
+    server = ThreadingHTTPServer(('0.0.0.0', port), PingHandler)
+    log.info(f"🌐 Keep-alive server started on port {port}")
     server.serve_forever()
 
 
 def print_banner():
     """Print startup banner"""
-    print("""
+    log.info("""
 ╔═══════════════════════════════════════════════════════════╗
 ║          Instagram DM Sales Agent Bot                     ║
 ║          Gemini AI + Automatic Lead Qualification         ║
@@ -45,12 +78,13 @@ def print_banner():
 
 def main():
     """Main entry point"""
+    setup_logging()
     print_banner()
     
     # Validate configuration
     if not validate_config():
-        print("\n❌ Please configure your .env file first!")
-        print("Copy .env.example to .env and fill in your credentials.")
+        log.error("\n❌ Please configure your .env file first!")
+        log.info("Copy .env.example to .env and fill in your credentials.")
         sys.exit(1)
     
     # Initialize database
@@ -64,44 +98,55 @@ def main():
             # Add leads: python main.py add username1 username2 ...
             usernames = sys.argv[2:]
             if usernames:
-                print(f"📋 Adding {len(usernames)} leads...")
+                from bot.scheduler import add_leads_from_list
+                log.info(f"📋 Adding {len(usernames)} leads...")
                 add_leads_from_list(usernames)
             else:
-                print("Usage: python main.py add username1 username2 ...")
+                log.info("Usage: python main.py add username1 username2 ...")
         
         elif command == "set-date":
             # Set account creation date: python main.py set-date 2024-01-01
             if len(sys.argv) > 2:
                 date_str = sys.argv[2]
                 set_account_created_date(date_str)
-                print(f"✅ Account creation date set to: {date_str}")
+                log.info(f"✅ Account creation date set to: {date_str}")
             else:
-                print("Usage: python main.py set-date YYYY-MM-DD")
+                log.info("Usage: python main.py set-date YYYY-MM-DD")
         
         elif command == "scrape-followers":
             # Scrape followers: python main.py scrape-followers source_username [amount]
             if len(sys.argv) > 2:
+                from bot.scheduler import scrape_followers_of_user
                 source_user = sys.argv[2]
                 amount = int(sys.argv[3]) if len(sys.argv) > 3 else 50
                 scrape_followers_of_user(source_user, amount)
             else:
-                print("Usage: python main.py scrape-followers source_username [amount]")
+                log.info("Usage: python main.py scrape-followers source_username [amount]")
         
         elif command == "discover":
             # Discover leads: python main.py discover "keyword" [amount]
             if len(sys.argv) > 2:
+                from bot.scheduler import discover_new_leads
                 query = sys.argv[2]
                 amount = int(sys.argv[3]) if len(sys.argv) > 3 else 20
                 discover_new_leads(query, amount)
             else:
-                print("Usage: python main.py discover \"keyword\" [amount]")
+                log.info("Usage: python main.py discover \"keyword\" [amount]")
         
         elif command == "discover-all":
             # Discover from all seeds: python main.py discover-all [amount_per_source]
+            from bot.scheduler import discover_all_uzbek_businesses
             amount = int(sys.argv[2]) if len(sys.argv) > 2 else 20
             discover_all_uzbek_businesses(amount)
         
+        elif command == "clear-niche-cache":
+            # Drop cached niche detections: python main.py clear-niche-cache
+            deleted = clear_niche_cache()
+            log.info(f"🧹 Niche cache cleared ({deleted} entries)")
+        
         elif command == "run":
+            from bot.scheduler import run_scheduler
+            
             # Start keep-alive server in background
             port = int(os.getenv("PORT", 8080))
             threading.Thread(target=start_keep_alive_server, args=(port,), daemon=True).start()
@@ -117,13 +162,14 @@ def main():
 
 def print_help():
     """Print usage help"""
-    print("""
+    log.info("""
 📚 Usage:
 
   python main.py run                    - Start the bot scheduler
   python main.py add user1 user2 ...    - Add leads (scrapes profiles)
   python main.py scrape-followers user [N] - Scrape N followers from a user
   python main.py set-date YYYY-MM-DD    - Set account creation date (for warmup)
+  python main.py clear-niche-cache      - Forget cached niche detections
 
 📝 Setup:
   1. Copy .env.example to .env
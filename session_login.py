@@ -4,11 +4,27 @@ Bu skript brauzerdan olingan session bilan login qiladi
 """
 from instagrapi import Client
 from pathlib import Path
-import json
+import copy
+
+from instagram import session_json
 
 DATA_DIR = Path(__file__).parent / "data"
 SESSION_FILE = DATA_DIR / "session.json"
 
+# Settings skeleton; only sessionid/csrftoken change per login
+_BASE_SETTINGS = {
+    "authorization_data": {
+        "ds_user_id": "",  # Bu avtomatik olinadi
+        "sessionid": "",
+        "csrftoken": "",
+    },
+    "cookies": {
+        "sessionid": "",
+        "csrftoken": "",
+    },
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
 
 def login_with_session_id(session_id: str, csrf_token: str, username: str):
     """
@@ -23,18 +39,11 @@ def login_with_session_id(session_id: str, csrf_token: str, username: str):
     cl = Client()
     
     # Session settings
-    cl.set_settings({
-        "authorization_data": {
-            "ds_user_id": "",  # Bu avtomatik olinadi
-            "sessionid": session_id,
-            "csrftoken": csrf_token,
-        },
-        "cookies": {
-            "sessionid": session_id,
-            "csrftoken": csrf_token,
-        },
-        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    })
+    settings = copy.deepcopy(_BASE_SETTINGS)
+    for section in ("authorization_data", "cookies"):
+        settings[section]["sessionid"] = session_id
+        settings[section]["csrftoken"] = csrf_token
+    cl.set_settings(settings)
     
     try:
         # Test the session
@@ -45,7 +54,7 @@ def login_with_session_id(session_id: str, csrf_token: str, username: str):
         
         # Save session for future use
         DATA_DIR.mkdir(exist_ok=True)
-        cl.dump_settings(SESSION_FILE)
+        SESSION_FILE.write_text(session_json.dumps(cl.get_settings()))
         print(f"✅ Session saved to {SESSION_FILE}")
         
         return cl